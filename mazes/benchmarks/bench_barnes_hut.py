@@ -0,0 +1,44 @@
+"""Scaling of the Barnes-Hut far-field repulsion against the exact O(N^2) sum.
+
+    python benchmarks/bench_barnes_hut.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maze_generators.maze.barnes_hut import barnes_hut_repulsion, exact_repulsion
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main(sizes=(1000, 4000, 16000, 64000, 256000), exact_limit=16000, theta=0.5, softening=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'N':>8} {'barnes-hut s':>13} {'exact s':>9} {'rel. error':>11} {'s / (N log N)':>14}")
+    times = []
+    for n in sizes:
+        points = rng.random((n, 2))
+        seconds, approximate = timed(barnes_hut_repulsion, points, theta, softening)
+        times.append(seconds)
+        exact_seconds, error = "", ""
+        if n <= exact_limit:
+            exact_time, exact = timed(exact_repulsion, points, softening)
+            exact_seconds = f"{exact_time:.3f}"
+            error = np.linalg.norm(approximate - exact, axis=1).mean() / np.linalg.norm(exact, axis=1).mean()
+            error = f"{error:.2e}"
+        print(f"{n:8d} {seconds:13.3f} {exact_seconds:>9} {error:>11} {seconds / (n * np.log(n)):14.3e}")
+
+    # O(N log N) shows as an exponent slightly above 1 and a flat last column
+    exponent = np.polyfit(np.log(sizes), np.log(times), 1)[0]
+    print(f"fitted exponent: time ~ N^{exponent:.2f}")
+
+
+if __name__ == "__main__":
+    main()
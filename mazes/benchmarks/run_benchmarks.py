@@ -0,0 +1,202 @@
+"""Size sweeps over the maze_generators package.
+
+Every case is timed at a few sizes with a fixed seed. For each size the best
+wall time over ``--repeat`` runs and the tracemalloc peak of one extra run are
+recorded, and a straight line through log(time) against log(n) gives the
+scaling exponent (1 is linear, 2 quadratic). Runs headless; results go to a
+JSON file so they can be compared across commits:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("MPLBACKEND", "Agg")  # path.py imports pyplot
+
+import numpy as np
+from shapely import Polygon
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from maze_generators.algorthms import depth_first, eller, kruskal, recursive_devision, wilson
+from maze_generators.maze.organic_growth_maze import OrganicGrowthMaze
+from maze_generators.renderer.debug_renderer import debug_render_maze
+from maze_generators.renderer.simple import simple_outline
+
+try:
+    from maze_generators.renderer.path import path
+except ImportError:  # geopandas is optional
+    path = None
+
+
+# Every setup takes (size, seed) and returns the number of elements the
+# size stands for and a function running the code under test once.
+
+def setup_depth_first(size, seed):
+    return size * size, lambda: depth_first.generate(size, size, seed=seed)
+
+
+def setup_recursive_division(size, seed):
+    return size * size, lambda: recursive_devision.generate(size, size, seed=seed)
+
+
+def setup_kruskal(size, seed):
+    return size * size, lambda: kruskal.generate(size, size, seed=seed)
+
+
+def setup_wilson(size, seed):
+    return size * size, lambda: wilson.generate(size, size, seed=seed)
+
+
+def setup_eller(size, seed):
+    return size * size, lambda: eller.generate(size, size, seed=seed)
+
+
+def setup_to_maze_mesh(size, seed):
+    maze = depth_first.generate(size, size, seed=seed)
+    return size * size, maze.to_maze_mesh
+
+
+def setup_simple_outline(size, seed):
+    mesh = depth_first.generate(size, size, seed=seed).to_maze_mesh()
+    return size * size, lambda: simple_outline(mesh, loops_skip=True)
+
+
+def setup_path(size, seed):
+    mesh = depth_first.generate(size, size, seed=seed).to_maze_mesh()
+    return size * size, lambda: path(mesh)
+
+
+def setup_debug_render(size, seed):
+    maze = depth_first.generate(size, size, seed=seed)
+    return size * size, lambda: debug_render_maze(maze)
+
+
+def setup_organic_growth(size, seed):
+    theta = np.linspace(0, 2 * np.pi, 100)
+    disc = Polygon(np.c_[2 * np.cos(theta), 2 * np.sin(theta)])
+
+    def run():
+        maze = OrganicGrowthMaze(size, {0: (-1.5, 0), size - 1: (1.5, 0)}, disc, seed=seed)
+        maze.min_distance = 0.2 * np.sqrt(50 / size)  # keep the neighbour count per node constant
+        maze.simulate(num_iterations=100, dt=0.1)
+        return maze
+
+    return size, run
+
+
+# name: (setup, sizes, quick sizes)
+CASES = {
+    "depth_first.generate": (setup_depth_first, [50, 100, 200, 400], [20, 40, 80]),
+    "recursive_devision.generate": (setup_recursive_division, [50, 100, 200, 400], [20, 40, 80]),
+    "kruskal.generate": (setup_kruskal, [50, 100, 200, 400], [20, 40, 80]),
+    "wilson.generate": (setup_wilson, [50, 100, 200, 400], [20, 40, 80]),
+    "eller.generate": (setup_eller, [50, 100, 200, 400], [20, 40, 80]),
+    "RectangularMaze.to_maze_mesh": (setup_to_maze_mesh, [25, 50, 100, 200], [10, 20, 40]),
+    "simple_outline": (setup_simple_outline, [25, 50, 100, 200], [10, 20, 40]),
+    "path": (setup_path, [5, 10, 20], [4, 8]),
+    "debug_render_maze": (setup_debug_render, [25, 50, 100, 200], [10, 20, 40]),
+    "OrganicGrowthMaze.simulate": (setup_organic_growth, [500, 1000, 2000, 4000], [200, 400]),
+}
+
+
+def measure(setup, size, seed, repeat):
+    n, function = setup(size, seed)
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n, min(seconds), peak
+
+
+def scaling_exponent(n, seconds):
+    if len(n) < 2:
+        return None
+    return float(np.polyfit(np.log(n), np.log(seconds), 1)[0])
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, quick, seed, repeat):
+    results = {}
+    for name in names:
+        setup, sizes, quick_sizes = CASES[name]
+        if name == "path" and path is None:
+            print(f"{name}: skipped, geopandas is not installed")
+            continue
+
+        result = {"sizes": [], "n": [], "seconds": [], "peak_bytes": []}
+        for size in quick_sizes if quick else sizes:
+            n, seconds, peak = measure(setup, size, seed, repeat)
+            result["sizes"].append(size)
+            result["n"].append(n)
+            result["seconds"].append(seconds)
+            result["peak_bytes"].append(peak)
+            print(f"{name:30s} n={n:8d} {seconds:9.4f} s {peak / 2**20:9.2f} MiB")
+        result["exponent"] = scaling_exponent(result["n"], result["seconds"])
+        if result["exponent"] is not None:
+            print(f"{name:30s} time ~ n^{result['exponent']:.2f}")
+        results[name] = result
+    return results
+
+
+def compare(results, baseline):
+    print("\nspeed-up against baseline (baseline time / current time)")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        old_seconds = dict(zip(old["n"], old["seconds"]))
+        for n, seconds in zip(result["n"], result["seconds"]):
+            if n in old_seconds:
+                print(f"{name:30s} n={n:8d} {old_seconds[n] / seconds:7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--quick", action="store_true", help="small sizes, for a smoke test")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = run(args.only, args.quick, args.seed, args.repeat)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "quick": args.quick,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
-import json
 import random
+from itertools import permutations
 
 from ..maze.rectangular_maze import RectangularMaze as Maze
 
 import numpy as np
-import matplotlib.pyplot as plt
-import random
 
 
+# all 24 orders in which a cell can try its west, east, south and north neighbour
+DIRECTION_ORDERS = list(permutations(range(4)))
 
 
 class DepthFirst:
@@ -16,45 +16,100 @@ class DepthFirst:
         self.reset()
 
     def reset(self):
-        self.possible_edges = self.maze.possible_edges()
+        self.indptr, self.indices = self.maze.adjacency()
         self.visited = np.zeros(self.maze.nr_nodes, dtype=bool)
 
     def random_start(self):
         return random.randint(0, self.maze.nr_nodes-1)
 
     def generate(self, node):
-        # print(str(self.maze))
-        # print(self.maze.graph)
-        """Recursive DFS maze generation."""
+        """Iterative DFS maze generation over the CSR adjacency of any maze."""
         self.visited[node] = 1  # Mark as a path
-        
-        next_nodes = self.possblle_next_point(node)
+        stack = [(node, iter(self.shuffled_next_points(node)))]
+
+        while stack:
+            node, next_nodes = stack[-1]
+            for next_node in next_nodes:
+                if self.is_valid(next_node):
+                    self.visited[next_node] = 1
+                    self.maze.add_connection(node, next_node)
+                    stack.append((next_node, iter(self.shuffled_next_points(next_node))))
+                    break
+            else:
+                stack.pop()  # Dead end, backtrack
+
+    def shuffled_next_points(self, node):
+        next_nodes = self.possblle_next_point(node).tolist()
         random.shuffle(next_nodes)  # Randomize direction for more randomness
-        
-        print(next_nodes)
-        for next_node in next_nodes:
-            next_node = int(next_node)
-            if self.is_valid(next_node):
-                self.maze.graph.append(( node, next_node ))
-                self.generate(next_node)  # Recursive DFS call
+        return next_nodes
 
     def possblle_next_point(self, node):
         """Check if the cell is within bounds and not visited yet."""
-        # print(node)
-        return np.argwhere(self.possible_edges[node] == 1).flatten()
+        return self.indices[self.indptr[node]:self.indptr[node+1]].copy()
 
     def is_valid(self, node):
         return not self.visited[node]
 
 
-def generate(width, height):
+def depth_first_edges(nr_col, nr_row, start=None, seed=None):
+    """Backtracking DFS on a rectangular grid with an explicit stack.
+
+    Neighbours are computed arithmetically from ``nr_col``/``nr_row``, so no
+    adjacency is built. Returns the spanning tree as an ``(nr_nodes - 1, 2)``
+    int64 array of ``(parent, child)`` edges in visiting order.
+    """
+    rng = np.random.default_rng(seed)
+    nr_nodes = nr_col * nr_row
+    if start is None:
+        start = int(rng.integers(nr_nodes))
+
+    # every cell tries its neighbours in its own random order
+    orders = rng.integers(len(DIRECTION_ORDERS), size=nr_nodes, dtype=np.int8).tolist()
+    offsets = (-1, 1, -nr_col, nr_col)
+    last_row = nr_nodes - nr_col
+
+    visited = np.zeros(nr_nodes, dtype=bool)
+    tried = [0] * nr_nodes
+    edges = np.empty((max(nr_nodes - 1, 0), 2), dtype=np.int64)
+    nr_edges = 0
+
+    visited[start] = True
+    stack = [start]
+    while stack:
+        node = stack[-1]
+        directions = DIRECTION_ORDERS[orders[node]]
+        k = tried[node]
+        while k < 4:
+            direction = directions[k]
+            k += 1
+            if direction == 0:
+                if node % nr_col == 0:
+                    continue
+            elif direction == 1:
+                if node % nr_col == nr_col - 1:
+                    continue
+            elif direction == 2:
+                if node < nr_col:
+                    continue
+            elif node >= last_row:
+                continue
+            next_node = node + offsets[direction]
+            if not visited[next_node]:
+                break
+        else:
+            stack.pop()  # Dead end, backtrack
+            continue
+
+        tried[node] = k
+        visited[next_node] = True
+        edges[nr_edges] = node, next_node
+        nr_edges += 1
+        stack.append(next_node)
+
+    return edges
+
+
+def generate(width, height, seed=None):
     maze = Maze(width, height)
-
-    df = DepthFirst(maze)
-    node = df.random_start()
-    m = df.generate(node)
-
-    print(str(maze))
-    print(maze.graph)
+    maze.connections = depth_first_edges(width, height, seed=seed)
     return maze
-
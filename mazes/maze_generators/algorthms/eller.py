@@ -0,0 +1,67 @@
+from ..maze.rectangular_maze import RectangularMaze as Maze
+from .recursive_devision import walls_to_edges
+
+import numpy as np
+
+
+def eller_rows(nr_col, nr_row=None, seed=None, p_join=0.5, p_north=0.4):
+    """Eller's algorithm, yields the walls of one row of a rectangular maze at a time.
+
+    Every row is an ``(east, north)`` pair of bool arrays where True is a
+    wall: ``east[x]`` between cells ``x`` and ``x + 1`` (length ``nr_col - 1``)
+    and ``north[x]`` between the cell and the one in the next row (length
+    ``nr_col``, all walls in the last row). Only the set labels of the
+    current row are kept, so memory is O(nr_col) whatever the height. With
+    ``nr_row=None`` rows are yielded forever, there is no last row to close.
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.arange(nr_col)
+    y = 0
+    while nr_row is None or y < nr_row:
+        last = y == nr_row - 1 if nr_row is not None else False
+
+        # Join neighbours that are in different sets, at random or always in the last row
+        join = np.ones(nr_col - 1, dtype=bool) if last else rng.random(nr_col - 1) < p_join
+        parent = np.arange(nr_col)  # union-find over the labels, which are < nr_col
+        parents = memoryview(parent)
+        east = np.ones(nr_col - 1, dtype=bool)
+        for x in np.flatnonzero(join).tolist():
+            a = labels[x]
+            while parents[a] != a:
+                parents[a] = a = parents[parents[a]]
+            b = labels[x + 1]
+            while parents[b] != b:
+                parents[b] = b = parents[parents[b]]
+            if a != b:
+                parents[a] = b
+                east[x] = False
+        while True:
+            root = parent[parent]
+            if (root == parent).all():
+                break
+            parent = root
+        labels = parent[labels]
+
+        if last:
+            yield east, np.ones(nr_col, dtype=bool)
+            return
+
+        # Open some walls to the next row, at least one per set
+        priority = rng.random(nr_col)
+        order = np.lexsort((priority, labels))
+        is_last_of_set = np.r_[labels[order][1:] != labels[order][:-1], True]
+        north = priority >= p_north
+        north[order[is_last_of_set]] = False
+        yield east, north
+
+        # Cells below a wall start a new set; relabel to 0..nr_col-1
+        labels = np.where(north, nr_col + np.arange(nr_col), labels)
+        labels = np.unique(labels, return_inverse=True)[1].reshape(-1)
+        y += 1
+
+
+def generate(width, height, seed=None):
+    maze = Maze(width, height)
+    east, north = zip(*eller_rows(width, height, seed=seed))
+    maze.connections = walls_to_edges(np.array(north[:-1], dtype=bool).reshape(-1, width), np.array(east, dtype=bool))
+    return maze
@@ -0,0 +1,58 @@
+from ..maze.rectangular_maze import RectangularMaze as Maze
+
+import numpy as np
+
+
+def csr_edges(indptr, indices):
+    """Every undirected edge of a CSR adjacency once, as an ``(E, 2)`` array with ``start < end``."""
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+    keep = rows < indices
+    return np.stack([rows[keep], indices[keep]], axis=1)
+
+
+def kruskal_edges(indptr, indices, seed=None, chunk=1 << 16):
+    """Randomized Kruskal over the CSR adjacency ``(indptr, indices)`` of any graph.
+
+    The edges are shuffled once and added in that order whenever they join
+    two different trees, tracked with a union-find with path halving on a
+    flat parent array. Returns the spanning tree as an ``(nr_nodes - 1, 2)``
+    int64 array in the order the edges were accepted (fewer rows when the
+    graph is not connected).
+    """
+    rng = np.random.default_rng(seed)
+    nr_nodes = len(indptr) - 1
+    dtype = np.int32 if nr_nodes < 2**31 else np.int64
+    edges = csr_edges(indptr, indices).astype(dtype)
+    rng.shuffle(edges)
+
+    parent = np.arange(nr_nodes, dtype=dtype)
+    tree = np.empty((max(nr_nodes - 1, 0), 2), dtype=np.int64)
+
+    # the loops index memoryviews of the arrays: plain ints, no numpy scalar overhead
+    parents = memoryview(parent)
+    tree_flat = memoryview(tree.reshape(-1))
+    nr_edges = 0
+    for start in range(0, len(edges), chunk):
+        for u, v in edges[start:start + chunk].tolist():
+            a = u
+            while parents[a] != a:
+                parents[a] = a = parents[parents[a]]
+            b = v
+            while parents[b] != b:
+                parents[b] = b = parents[parents[b]]
+            if a == b:
+                continue  # already in the same tree, the edge would close a loop
+            parents[a] = b
+            tree_flat[2 * nr_edges] = u
+            tree_flat[2 * nr_edges + 1] = v
+            nr_edges += 1
+        if nr_edges == nr_nodes - 1:
+            break
+
+    return tree[:nr_edges]
+
+
+def generate(width, height, seed=None):
+    maze = Maze(width, height)
+    maze.connections = kruskal_edges(*maze.adjacency(), seed=seed)
+    return maze
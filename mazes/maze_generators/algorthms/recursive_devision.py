@@ -1,6 +1,8 @@
 import json
 import random
 
+import numpy as np
+
 from ..maze.rectangular_maze import RectangularMaze as Maze
 
 def generate_recursive_division_maze(width, height, maze=None, offset_x=0, offset_y=0):
@@ -23,7 +25,7 @@ def generate_recursive_division_maze(width, height, maze=None, offset_x=0, offse
                     maze[i, r],
                     maze[i, r+1]
                 )
-                maze.graph.remove(edge)
+                maze.remove_connection(*edge)
         if r_ >= 1:
             generate_recursive_division_maze(width, r_ + 1, maze, offset_x, offset_y)
         if height - r_ > 2:
@@ -42,7 +44,7 @@ def generate_recursive_division_maze(width, height, maze=None, offset_x=0, offse
                     maze[r, i],
                     maze[r+1, i]
                 )
-                maze.graph.remove(edge)
+                maze.remove_connection(*edge)
                 
         if r_ >= 1 :
             generate_recursive_division_maze(r_+1, height, maze, offset_x, offset_y)
@@ -51,8 +53,67 @@ def generate_recursive_division_maze(width, height, maze=None, offset_x=0, offse
         
     return maze
 
-def generate(width, height):
+def recursive_division_walls(nr_col, nr_row, seed=None):
+    """Recursive division on two boolean wall planes, True meaning a wall.
+
+    ``horizontal[y, x]`` is the wall between cell ``(x, y)`` and ``(x, y+1)``,
+    ``vertical[y, x]`` the wall between ``(x, y)`` and ``(x+1, y)``. Every
+    division cuts a whole wall span with one slice assignment, and regions
+    still to divide are kept on an explicit work queue instead of the stack.
+    """
+    rng = np.random.default_rng(seed)
+    horizontal = np.zeros((nr_row - 1, nr_col), dtype=bool)
+    vertical = np.zeros((nr_row, nr_col - 1), dtype=bool)
+
+    # a maze of N cells takes exactly N - 1 divisions, each drawing a wall
+    # position and an opening, so all random numbers are drawn up front
+    uniforms = iter(rng.random(2 * max(nr_col * nr_row - 1, 0)).tolist())
+
+    queue = [(0, 0, nr_col, nr_row)] if nr_col * nr_row > 1 else []
+    while queue:
+        offset_x, offset_y, width, height = queue.pop()
+
+        r = int(next(uniforms) * (width + height - 2))
+        opening = next(uniforms)
+        if r < height - 1:
+            y = offset_y + r
+            horizontal[y, offset_x:offset_x + width] = True
+            horizontal[y, offset_x + int(opening * width)] = False
+            if width + r > 1:
+                queue.append((offset_x, offset_y, width, r + 1))
+            if width + height - r > 3:
+                queue.append((offset_x, y + 1, width, height - r - 1))
+        else:
+            r -= height - 1
+            x = offset_x + r
+            vertical[offset_y:offset_y + height, x] = True
+            vertical[offset_y + int(opening * height), x] = False
+            if height + r > 1:
+                queue.append((offset_x, offset_y, r + 1, height))
+            if width + height - r > 3:
+                queue.append((x + 1, offset_y, width - r - 1, height))
+
+    return horizontal, vertical
+
+
+def walls_to_edges(horizontal, vertical):
+    """Convert wall planes into the ``(E, 2)`` edge array used as ``maze.graph``.
+
+    Edges are ordered like ``RectangularMaze.fill_graph``: first the
+    connections to the east neighbour, then those to the north neighbour.
+    """
+    nr_col = horizontal.shape[1] if horizontal.size else vertical.shape[1] + 1
+    ys, xs = np.nonzero(~vertical)
+    start = ys * nr_col + xs
+    east = np.stack([start, start + 1], axis=1)
+    ys, xs = np.nonzero(~horizontal)
+    start = ys * nr_col + xs
+    north = np.stack([start, start + nr_col], axis=1)
+    return np.concatenate([east, north]).astype(np.int64)
+
+
+def generate(width, height, seed=None):
     maze = Maze(width, height)
-    maze.fill_graph()
-    generate_recursive_division_maze(height, width, maze, 0, 0)
-    return maze
\ No newline at end of file
+    horizontal, vertical = recursive_division_walls(width, height, seed=seed)
+    maze.connections = walls_to_edges(horizontal, vertical)
+    return maze
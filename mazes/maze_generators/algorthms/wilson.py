@@ -0,0 +1,63 @@
+from ..maze.rectangular_maze import RectangularMaze as Maze
+
+import numpy as np
+
+
+def wilson_edges(indptr, indices, root=None, seed=None, block=1 << 16):
+    """Wilson's algorithm over the CSR adjacency ``(indptr, indices)`` of any connected graph.
+
+    Gives a uniform spanning tree. From every node not yet in the tree a
+    random walk runs until it hits the tree. Only the last exit of every node
+    is kept in ``next_node``, so following the pointers from the start of the
+    walk gives the loop-erased path, which is then added to the tree.
+    Returns the tree as an ``(nr_nodes - 1, 2)`` int64 array of
+    ``(node, next_node)`` edges pointing towards ``root``.
+    """
+    rng = np.random.default_rng(seed)
+    nr_nodes = len(indptr) - 1
+    if root is None:
+        root = int(rng.integers(nr_nodes))
+
+    in_tree = np.zeros(nr_nodes, dtype=np.uint8)
+    in_tree[root] = 1
+    next_node = np.empty(nr_nodes, dtype=np.int64)
+    tree = np.empty((max(nr_nodes - 1, 0), 2), dtype=np.int64)
+
+    starts = memoryview(np.ascontiguousarray(indptr, dtype=np.int64))
+    neighbours = memoryview(np.ascontiguousarray(indices, dtype=np.int64))
+    in_trees = memoryview(in_tree)
+    next_nodes = memoryview(next_node)
+    tree_flat = memoryview(tree.reshape(-1))
+
+    draws = []
+    d = 0
+    k = 0
+    for start in range(nr_nodes):
+        node = start
+        while not in_trees[node]:
+            if d == len(draws):
+                draws = rng.random(block).tolist()
+                d = 0
+            first = starts[node]
+            node_next = neighbours[first + int(draws[d] * (starts[node + 1] - first))]
+            d += 1
+            next_nodes[node] = node_next
+            node = node_next
+
+        # Retrace the walk along the last exits, which erases its loops
+        node = start
+        while not in_trees[node]:
+            in_trees[node] = 1
+            node_next = next_nodes[node]
+            tree_flat[k] = node
+            tree_flat[k + 1] = node_next
+            k += 2
+            node = node_next
+
+    return tree
+
+
+def generate(width, height, seed=None):
+    maze = Maze(width, height)
+    maze.connections = wilson_edges(*maze.adjacency(), seed=seed)
+    return maze
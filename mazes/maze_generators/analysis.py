@@ -0,0 +1,101 @@
+"""Quality metrics of mazes, computed on the edge array with scipy.sparse.csgraph.
+
+Works for any Maze with ``nodes`` and ``connections``: RectangularMaze
+(solved from node 0 to the last node) and OrganicGrowthMaze (solved between
+its first and last fixed node).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components, shortest_path
+
+
+@dataclass
+class MazeMetrics:
+    nr_nodes: int
+    solution_length: float  # edges on the path from start to end, inf when they are not connected
+    dead_ends: int  # nodes with a single connection
+    junctions: int  # nodes with three or more connections
+    branching_factor: float  # mean number of extra choices at a junction
+    longest_corridor: int  # most nodes in a run of nodes with exactly two connections
+
+
+def endpoints(maze, nr_nodes=None):
+    """Default ``(start, end)`` nodes of the solution."""
+    fixed_nodes = getattr(maze, "fixed_nodes", None)
+    if fixed_nodes:
+        fixed = sorted(fixed_nodes)
+        return fixed[0], fixed[-1]
+    return 0, (maze.nr_nodes if nr_nodes is None else nr_nodes) - 1
+
+
+def graph(maze, nr_nodes=None):
+    """Symmetric sparse adjacency matrix of the connections of ``maze``."""
+    if nr_nodes is None:
+        nr_nodes = maze.nr_nodes
+    edges = maze.edge_array()
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    columns = np.concatenate([edges[:, 1], edges[:, 0]])
+    return coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, columns)), shape=(nr_nodes, nr_nodes)).tocsr()
+
+
+def degrees(maze, nr_nodes=None):
+    """Number of connections of every node."""
+    if nr_nodes is None:
+        nr_nodes = maze.nr_nodes
+    return np.bincount(maze.edge_array().reshape(-1), minlength=nr_nodes)
+
+
+def solution_length(maze, start=None, end=None, adjacency=None, nr_nodes=None):
+    default_start, default_end = endpoints(maze, nr_nodes)
+    start = default_start if start is None else start
+    end = default_end if end is None else end
+    if adjacency is None:
+        adjacency = graph(maze, nr_nodes)
+    return float(shortest_path(adjacency, directed=False, unweighted=True, indices=start)[end])
+
+
+def solution_path(maze, start=None, end=None):
+    """Node indices on the path from ``start`` to ``end``, empty when there is none."""
+    default_start, default_end = endpoints(maze)
+    start = default_start if start is None else start
+    end = default_end if end is None else end
+    _, predecessors = breadth_first_order(graph(maze), start, directed=False, return_predecessors=True)
+
+    path = [end]
+    while path[-1] != start:
+        node = predecessors[path[-1]]
+        if node < 0:
+            return np.empty(0, dtype=np.int64)
+        path.append(node)
+    return np.array(path[::-1], dtype=np.int64)
+
+
+def longest_corridor(maze, adjacency=None, degree=None):
+    """Size of the largest connected group of nodes with exactly two connections."""
+    if adjacency is None:
+        adjacency = graph(maze)
+    if degree is None:
+        degree = degrees(maze)
+    corridor = np.flatnonzero(degree == 2)
+    if len(corridor) == 0:
+        return 0
+    _, labels = connected_components(adjacency[corridor][:, corridor], directed=False)
+    return int(np.bincount(labels).max())
+
+
+def analyse(maze, start=None, end=None):
+    """All metrics of ``maze`` at once, sharing the adjacency and degrees."""
+    nr_nodes = maze.nr_nodes
+    adjacency = graph(maze, nr_nodes)
+    degree = degrees(maze, nr_nodes)
+    junction = degree >= 3
+    return MazeMetrics(
+        nr_nodes=nr_nodes,
+        solution_length=solution_length(maze, start, end, adjacency, nr_nodes),
+        dead_ends=int((degree == 1).sum()),
+        junctions=int(junction.sum()),
+        branching_factor=float((degree[junction] - 2).mean()) if junction.any() else 0.0,
+        longest_corridor=longest_corridor(maze, adjacency, degree),
+    )
@@ -0,0 +1,131 @@
+"""Barnes-Hut approximation of a soft long-range repulsion between points.
+
+The exact force on point i is
+
+    F_i = sum_j m_j (x_i - x_j) / (|x_i - x_j|^2 + softening^2)
+
+which is O(N^2). Here the points are sorted along a Morton (Z-order) curve,
+which lays out a linear quadtree: the cells of every level are contiguous
+runs of the sorted points. A cell of size s at distance d is replaced by its
+total mass at its centre of mass when s / d < theta. The tree walk is done
+breadth first for all points at once, level by level, on NumPy arrays.
+"""
+import numpy as np
+
+
+def _spread_bits(v):
+    """Interleave zeros between the lower 32 bits of v, used for Morton codes."""
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+class QuadTree:
+    """Linear quadtree over ``points`` with mass and centre of mass per cell."""
+
+    def __init__(self, points, depth=16):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.depth = depth
+        self.origin = points.min(axis=0)
+        self.size = float((points.max(axis=0) - self.origin).max()) or 1.0
+
+        cells = np.floor((points - self.origin) / self.size * 2**depth).astype(np.int64)
+        cells = np.clip(cells, 0, 2**depth - 1)
+        codes = (_spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << np.uint64(1))).astype(np.int64)
+
+        self.order = np.argsort(codes, kind="stable")
+        self.points = points[self.order]
+        codes = codes[self.order]
+
+        # Per level: the code, mass and centre of mass of every non-empty cell,
+        # and for every point the index of the cell it lies in
+        self.codes, self.mass, self.centre, self.point_cell = [], [], [], []
+        for level in range(depth + 1):
+            level_codes = codes >> (2 * (depth - level))
+            first = np.flatnonzero(np.r_[True, level_codes[1:] != level_codes[:-1]])
+            mass = np.diff(np.r_[first, len(codes)])
+            self.codes.append(level_codes[first])
+            self.mass.append(mass)
+            self.centre.append(np.add.reduceat(self.points, first, axis=0) / mass[:, None])
+            self.point_cell.append(np.repeat(np.arange(len(first)), mass))
+
+        # Children of cell k at level l are cells child_start[l][k]:child_start[l][k+1]
+        self.child_start = []
+        for level in range(depth):
+            parents = self.codes[level + 1] >> 2
+            self.child_start.append(np.searchsorted(parents, np.r_[self.codes[level], np.iinfo(np.int64).max]))
+
+    def repulsion(self, theta=0.5, softening=0.01, chunk=16384):
+        """Approximate repulsion on every point, in the order of the input points."""
+        forces = np.zeros_like(self.points)
+        for start in range(0, len(self.points), chunk):
+            targets = np.arange(start, min(start + chunk, len(self.points)))
+            forces[targets] = self._walk(targets, theta, softening)
+
+        result = np.empty_like(forces)
+        result[self.order] = forces
+        return result
+
+    def _walk(self, targets, theta, softening):
+        forces = np.zeros((len(targets), 2))
+        local = np.arange(len(targets))  # row in forces of every (target, cell) pair
+        cells = np.zeros(len(targets), dtype=np.int64)
+        eps2 = softening**2
+
+        for level in range(self.depth + 1):
+            points = self.points[targets[local]]
+            mass = self.mass[level][cells].astype(float)
+            centre = self.centre[level][cells]
+            own = self.point_cell[level][targets[local]] == cells
+
+            if level == self.depth:
+                # Points sharing a leaf: take the leaf without the point itself
+                mass = np.where(own, mass - 1, mass)
+                centre = np.where(
+                    own[:, None], (centre * (mass + 1)[:, None] - points) / np.maximum(mass, 1)[:, None], centre
+                )
+                accept = mass > 0
+            else:
+                size = self.size / 2**level
+                distance2 = ((points - centre) ** 2).sum(axis=1)
+                accept = ~own & ((mass == 1) | (size * size < theta * theta * distance2))
+
+            displacement = points[accept] - centre[accept]
+            weight = mass[accept] / ((displacement**2).sum(axis=1) + eps2)
+            rows = local[accept]
+            forces[:, 0] += np.bincount(rows, weight * displacement[:, 0], minlength=len(targets))
+            forces[:, 1] += np.bincount(rows, weight * displacement[:, 1], minlength=len(targets))
+
+            # Open the remaining cells; a cell holding only the target itself is dropped
+            expand = ~accept & ~(own & (mass <= 1))
+            if level == self.depth or not expand.any():
+                break
+            local, cells = local[expand], cells[expand]
+            first = self.child_start[level][cells]
+            count = self.child_start[level][cells + 1] - first
+            local = np.repeat(local, count)
+            cells = np.repeat(first - np.cumsum(count) + count, count) + np.arange(count.sum())
+
+        return forces
+
+
+def barnes_hut_repulsion(points, theta=0.5, softening=0.01, depth=16):
+    """Barnes-Hut approximation of the softened repulsion on every point."""
+    if len(points) < 2:
+        return np.zeros((len(points), 2))
+    return QuadTree(points, depth).repulsion(theta, softening)
+
+
+def exact_repulsion(points, softening=0.01, chunk=1024):
+    """The O(N^2) sum approximated by barnes_hut_repulsion, for testing and benchmarks."""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    forces = np.zeros_like(points)
+    for start in range(0, len(points), chunk):
+        displacement = points[start:start + chunk, None, :] - points[None, :, :]
+        weight = 1 / ((displacement**2).sum(axis=2) + softening**2)
+        forces[start:start + chunk] = (weight[:, :, None] * displacement).sum(axis=1)
+    return forces
@@ -0,0 +1,75 @@
+"""Compact binary container for maze data.
+
+Layout of a file::
+
+    b"MAZEBIN1"                       8 byte magic
+    header length                     little endian uint64
+    header                            utf-8 JSON
+    arrays                            raw C-order data, each 64 byte aligned
+
+The header holds free-form ``metadata`` plus the dtype, shape and byte offset
+of every array, so arrays can be memory-mapped straight from the file.
+"""
+import json
+
+import numpy as np
+
+MAGIC = b"MAZEBIN1"
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_binary(path, metadata, arrays):
+    """Write ``metadata`` (JSON serialisable) and a dict of named arrays to ``path``."""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Offsets depend on the header length, which depends on the offsets.
+    # Reserve room for the header first and lay the arrays out behind it.
+    layout = {name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 0}
+              for name, array in arrays.items()}
+    header = {"metadata": metadata, "arrays": layout}
+    reserved = len(json.dumps(header).encode()) + 32 * len(arrays) + 64
+    offset = _aligned(len(MAGIC) + 8 + reserved)
+    for name, array in arrays.items():
+        layout[name]["offset"] = offset
+        offset = _aligned(offset + array.nbytes)
+
+    encoded = json.dumps(header).encode().ljust(reserved)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(encoded)).tobytes())
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(offset)
+
+
+def read_binary(path, mmap_mode="r"):
+    """Read a file written by ``write_binary``, returns ``(metadata, arrays)``.
+
+    With the default ``mmap_mode="r"`` the arrays are read-only memory maps,
+    so opening is near-instant and data is paged in on access. Pass
+    ``mmap_mode=None`` to load everything into memory.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a maze binary file")
+        header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_length).decode())
+
+        arrays = {}
+        for name, layout in header["arrays"].items():
+            dtype = np.dtype(layout["dtype"])
+            shape = tuple(layout["shape"])
+            if mmap_mode is None or int(np.prod(shape)) == 0:
+                f.seek(layout["offset"])
+                count = int(np.prod(shape))
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode,
+                                         offset=layout["offset"], shape=shape)
+    return header["metadata"], arrays
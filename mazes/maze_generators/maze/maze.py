@@ -3,6 +3,23 @@ import json
 
 import numpy as np
 
+from .binary import read_binary, write_binary
+
+
+def edge_key(start, end):
+    """Pack an undirected edge into a single int, independent of its orientation."""
+    start, end = int(start), int(end)
+    if start > end:
+        start, end = end, start
+    return (start << 32) | end
+
+
+def edge_keys(edges):
+    """Vectorised ``edge_key`` for an ``(E, 2)`` array of edges."""
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    return (edges.min(axis=1) << 32) | edges.max(axis=1)
+
+
 class Maze:
     def __init__(self, nodes=None, connections=None, vertices=None, faces=None):
         self.name = "Indexed Maze"
@@ -14,14 +31,68 @@ class Maze:
     def nr_nodes(self):
         return len(self.nodes)
 
+    @property
+    def connections(self):
+        return self._connections
+
+    @connections.setter
+    def connections(self, connections):
+        self._connections = connections
+        self._edge_index = None
+
+    @property
+    def graph(self):
+        return self.connections
+
+    @graph.setter
+    def graph(self, graph):
+        self.connections = graph
+
+    @property
+    def edge_index(self):
+        """Set of packed edge keys, kept in sync by add_connection/remove_connection.
+
+        Reassigning ``connections`` (or ``graph``) rebuilds it on the next lookup.
+        """
+        if self._edge_index is None:
+            self._edge_index = set(edge_keys(self.edge_array()).tolist())
+        return self._edge_index
+
+    def edge_array(self):
+        """The connections as an ``(E, 2)`` int64 array."""
+        if self.connections is None or len(self.connections) == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.asarray(self.connections, dtype=np.int64).reshape(-1, 2)
+
+    def add_connection(self, start, end):
+        if self.connections is None:
+            self.connections = []
+        elif isinstance(self.connections, np.ndarray):
+            self._connections = [tuple(edge) for edge in self.connections.tolist()]
+        self.connections.append((start, end))
+        if self._edge_index is not None:
+            self._edge_index.add(edge_key(start, end))
+
+    def remove_connection(self, start, end):
+        """Remove the connection between start and end, in either orientation."""
+        if isinstance(self.connections, np.ndarray):
+            self._connections = [tuple(edge) for edge in self.connections.tolist()]
+        key = edge_key(start, end)
+        for i, edge in enumerate(self.connections):
+            if edge_key(edge[0], edge[1]) == key:
+                del self.connections[i]
+                break
+        else:
+            raise ValueError(f"no connection between {start} and {end}")
+        if self._edge_index is not None:
+            self._edge_index.discard(key)
+
     def to_json(self):
-        if isinstance(self.nodes, np.ndarray):
-            self.nodes = self.nodes.tolist()
         d = {
             "class": self.__class__.__name__,
             "name": self.name,
-            "nodes": self.nodes,
-            "connections": self.connections,
+            "nodes": np.asarray(self.nodes).tolist(),
+            "connections": self.edge_array().tolist(),
         }
         return json.dumps(d, indent=2)
 
@@ -29,13 +100,17 @@ class Maze:
     def from_json(json_string):
         json_string["class"]
 
-        if json_string["class"] == "RectangularMaze":
+        if json_string["class"] == "PackedRectangularMaze":
+            from .packed_rectangular_maze import PackedRectangularMaze
+            maze = PackedRectangularMaze(json_string["nr_col"], json_string["nr_row"])
+            maze.connections = json_string["graph"]
+        elif json_string["class"] == "RectangularMaze":
             from .rectangular_maze import RectangularMaze
             maze = RectangularMaze(
                 json_string["nr_col"],
                 json_string["nr_row"],
             )
-            maze.connections = json_string["connections"],
+            maze.connections = json_string.get("graph", json_string.get("connections"))
         else:
             maze = Maze(
                 json_string["nodes"],
@@ -48,12 +123,50 @@ class Maze:
         with open(f"jsons/"+filename, "w") as f:
             f.write(self.to_json())
 
+    def binary_metadata(self):
+        return {"class": self.__class__.__name__, "name": self.name}
+
+    def to_binary(self, path):
+        """Write nodes, edges and class metadata to ``path`` in the maze binary format."""
+        arrays = {
+            "nodes": np.asarray(self.nodes, dtype=float).reshape(-1, 2),
+            "connections": self.edge_array(),
+        }
+        write_binary(path, self.binary_metadata(), arrays)
+
+    @staticmethod
+    def from_binary(path, mmap_mode="r"):
+        """Open a maze written by ``to_binary``; arrays are memory-mapped by default."""
+        metadata, arrays = read_binary(path, mmap_mode=mmap_mode)
+
+        if metadata["class"] == "PackedRectangularMaze":
+            from .packed_rectangular_maze import PackedRectangularMaze
+            maze = PackedRectangularMaze(metadata["nr_col"], metadata["nr_row"], walls=arrays["walls"])
+            maze.name = metadata["name"]
+            return maze
+        if metadata["class"] == "RectangularMaze":
+            from .rectangular_maze import RectangularMaze
+            maze = RectangularMaze(metadata["nr_col"], metadata["nr_row"])
+        else:
+            maze = Maze(arrays["nodes"])
+        maze.name = metadata["name"]
+        maze.connections = arrays["connections"]
+
+        return maze
+
     def contains_connection(self, edge):
-        edge = (edge[0], edge[1])
-        edge_reversed = (edge[1], edge[0])
-        return (edge in self.connections) or (edge_reversed in self.connections)
+        return edge_key(edge[0], edge[1]) in self.edge_index
+
+    def contains_connections(self, edges):
+        """Vectorised contains_connection for an ``(E, 2)`` array of edges."""
+        return np.isin(edge_keys(edges), edge_keys(self.edge_array()))
     
     @abstractmethod
     def possible_edges(self):
         pass
+
+    @abstractmethod
+    def adjacency(self):
+        """Sparse CSR adjacency as ``(indptr, indices)`` arrays."""
+        pass
         
\ No newline at end of file
@@ -1,153 +1,255 @@
-
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import List
 
 import numpy as np
 
 
-@dataclass 
+# Vertex, Face and Loop are thin views on the arrays of a MazeMesh. They are
+# created on demand and hold nothing but the mesh and their own index.
+
+@dataclass(eq=False)
 class Vertex:
-    coordinates: np.ndarray
-    maze: 'Maze' = None # type: ignore
+    maze: 'MazeMesh'
+    index: int
 
-    index: int = field(init=False)
+    @property
+    def coordinates(self) -> np.ndarray:
+        return self.maze.vertex_coordinates[self.index]
 
     def to_json(self):
-        return  self.coordinates.tolist() 
+        return  self.coordinates.tolist()
 
-    def __post_init__(self):
-        self.maze.vertices.append(self)
-        self.index = len(self.maze.vertices)-1
-        
     def __getitem__(self, index):
         return self.coordinates[index]
 
     @property
     def x(self):
         return self.coordinates[0]
-    
+
     @property
     def y(self):
         return self.coordinates[1]
 
 
 
-@dataclass
+@dataclass(eq=False)
 class Face:
-    vertex_indices: list[int]
-    maze: 'Maze' = None # type: ignore
-    
-    index: int = field(init=False)
-    loops: List['Loop'] = field(init=False)
-
-    def __post_init__(self):
-        self.maze.faces.append(self)
-        self.index = len(self.maze.faces)-1
-        self.loops = []
-        for i in range(len(self.vertex_indices)):
-            start = self.vertex_indices[i]
-            end = self.vertex_indices[(i+1) % len(self.vertex_indices)]
-            
-            self.loops.append(Loop(start, end, self, self.maze))
+    maze: 'MazeMesh'
+    index: int
 
+    @property
+    def loop_range(self):
+        return range(self.maze.face_offsets[self.index], self.maze.face_offsets[self.index + 1])
+
+    @property
+    def vertex_indices(self) -> List[int]:
+        start, end = self.maze.face_offsets[self.index:self.index + 2]
+        return self.maze.face_vertices[start:end].tolist()
+
+    @property
+    def loops(self) -> List['Loop']:
+        return [Loop(self.maze, i) for i in self.loop_range]
 
     def to_json(self):
         return self.vertex_indices
 
     def contains_loop(self, loop):
         return loop in self.loops
-    
 
-@dataclass
+
+@dataclass(eq=False)
 class Loop:
-    vertex_index: int
-    vertex_next_index: int
-    face: 'Face'
-    # edge: Edge                 # The edge this loop is part of
-    maze_mesh: 'Maze' = None  # type: ignore # Reference to the parent Maze, set by the update method
+    maze_mesh: 'MazeMesh'
+    index: int  # Position in maze_mesh.loops
+
+    @property
+    def vertex_index(self) -> int:
+        return int(self.maze_mesh.loop_vertex[self.index])
+
+    @property
+    def vertex_next_index(self) -> int:
+        return int(self.maze_mesh.loop_vertex_next[self.index])
+
+    @property
+    def face(self) -> Face:
+        return Face(self.maze_mesh, int(self.maze_mesh.loop_face[self.index]))
 
     @property
     def next_loop(self):
-        return self.face.loops[(self.face.loops.index(self)+1) % len(self.face.loops)]
+        return Loop(self.maze_mesh, int(self.maze_mesh.loop_next[self.index]))
 
     @property
     def prev_loop(self):
-        return self.face.loops[(self.face.loops.index(self)-1) % len(self.face.loops)]
-    
+        return Loop(self.maze_mesh, int(self.maze_mesh.loop_prev[self.index]))
+
     @property
     def opposite_loop(self):
-        reversed_loop = Loop(self.vertex_next_index, self.vertex_index, None, self.maze_mesh)
-        for f in self.maze_mesh.faces:
-            if f.contains_loop(reversed_loop):
-                reversed_loop.face = f
-                return reversed_loop
-        return None
+        twin = int(self.maze_mesh.loop_twin[self.index])
+        if twin < 0:
+            return None
+        return Loop(self.maze_mesh, twin)
 
     def __eq__(self, loop):
         return self.vertex_index == loop.vertex_index and self.vertex_next_index == loop.vertex_next_index
-        
+
     def is_open(self) -> bool:
         """Check if this loop is open by verifying the connection between its face's centroid and the opposite loop's face centroid."""
-        if self.opposite_loop is None:
+        twin = self.maze_mesh.loop_twin[self.index]
+        if twin < 0:
             return False  # If there is no opposite loop, it's not an open connection.
-        
-        current_centroid_index = self.face.index
-        opposite_centroid_index = self.opposite_loop.face.index
-        
-        # Check if the tuple (current_centroid, opposite_centroid) or (opposite_centroid, current_centroid) is in the graph
-        return  ( [ current_centroid_index, opposite_centroid_index ] in self.maze_mesh.maze.graph or \
-               [ opposite_centroid_index, current_centroid_index ] in self.maze_mesh.maze.graph)
+
+        current_centroid_index = int(self.maze_mesh.loop_face[self.index])
+        opposite_centroid_index = int(self.maze_mesh.loop_face[twin])
+
+        # Check if the edge between both centroids is in the graph, in either orientation
+        return self.maze_mesh.maze.contains_connection((current_centroid_index, opposite_centroid_index))
 
     @property
     def coor(self):
         return self.maze_mesh.vertices[self.vertex_index]
 
+
+class MeshElements:
+    """Read-only sequence of Vertex, Face or Loop views, built when accessed."""
+
+    def __init__(self, mesh, view, size):
+        self.mesh = mesh
+        self.view = view
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.view(self.mesh, i) for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self.view(self.mesh, int(index))
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self.view(self.mesh, i)
+
+
 class MazeMesh:
-    def __init__(self, maze, vertices, faces):
-        self.maze = maze
-        self.init_mesh(vertices, faces)
+    """Polygon mesh whose faces are the cells of ``maze``.
 
-    def init_mesh(self, vertices, faces):
-        self.vertices = []
-        self.faces = []
-        for v in vertices:
-            self.new_vertex(v[0], v[1])
+    Storage is array based: ``vertex_coordinates`` is a ``(V, 2)`` float
+    array and the faces are a CSR layout, the vertices of face ``f`` being
+    ``face_vertices[face_offsets[f]:face_offsets[f+1]]``. ``vertices``,
+    ``faces`` and ``loops`` hand out views on these arrays. Meshes with a
+    known structure can pass ``loop_twin`` to skip the twin search.
+    """
 
-        for f in faces:
-            self.new_face(f) 
+    def __init__(self, maze, vertices, faces, loop_twin=None):
+        self.maze = maze
+        self.init_mesh(vertices, faces, loop_twin)
+
+    def init_mesh(self, vertices, faces, loop_twin=None):
+        self.vertex_coordinates = np.asarray(vertices, dtype=float).reshape(-1, 2)
+
+        if isinstance(faces, np.ndarray) and faces.ndim == 2:
+            nr_faces, face_size = faces.shape
+            self.face_vertices = faces.astype(np.int64, copy=False).ravel()
+            self.face_offsets = np.arange(nr_faces + 1, dtype=np.int64) * face_size
+        else:
+            sizes = np.fromiter((len(f) for f in faces), dtype=np.int64)
+            self.face_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=self.face_offsets[1:])
+            self.face_vertices = np.fromiter(
+                (v for f in faces for v in f), dtype=np.int64, count=int(self.face_offsets[-1])
+            )
+
+        self.vertices = MeshElements(self, Vertex, len(self.vertex_coordinates))
+        self.faces = MeshElements(self, Face, len(self.face_offsets) - 1)
+        self.loops = MeshElements(self, Loop, len(self.face_vertices))
+
+        self.init_half_edges(loop_twin)
+
+    def init_half_edges(self, loop_twin=None):
+        """Build the half-edge table: twin, next and prev loop index per loop.
+
+        Loop ``i`` starts at ``face_vertices[i]``, so next/prev follow from the
+        face offsets. Twins are found by matching packed ``(v0, v1)`` keys
+        against the reversed ``(v1, v0)`` keys, unless ``loop_twin`` is given;
+        a border loop has twin -1.
+        """
+        sizes = np.diff(self.face_offsets)
+        nr_loops = len(self.face_vertices)
+        if len(sizes) and (sizes == sizes[0]).all():
+            # all faces the same size: only the last/first loop of a face wraps around
+            face_size = int(sizes[0])
+            loop_next = np.arange(1, nr_loops + 1, dtype=np.int64).reshape(-1, face_size)
+            loop_next[:, -1] -= face_size
+            loop_prev = np.arange(-1, nr_loops - 1, dtype=np.int64).reshape(-1, face_size)
+            loop_prev[:, 0] += face_size
+            self.loop_next = loop_next.ravel()
+            self.loop_prev = loop_prev.ravel()
+        else:
+            face_start = np.repeat(self.face_offsets[:-1], sizes)
+            face_size = np.repeat(sizes, sizes)
+            local = np.arange(nr_loops, dtype=np.int64) - face_start
+            self.loop_next = face_start + (local + 1) % face_size
+            self.loop_prev = face_start + (local - 1) % face_size
+        self.loop_face = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+
+        self.loop_vertex = self.face_vertices
+        self.loop_vertex_next = self.loop_vertex[self.loop_next]
+        self.loop_order = self.loop_keys = None  # sorted on the first find_loops
+        if loop_twin is None:
+            loop_twin = self.find_loops(self.loop_vertex_next, self.loop_vertex)
+        self.loop_twin = np.asarray(loop_twin, dtype=np.int64)
+
+    def find_loops(self, v0, v1):
+        """Indices of the loops running from v0 to v1 (-1 where there is none)."""
+        if self.loop_keys is None:
+            keys = self.loop_vertex * len(self.vertices) + self.loop_vertex_next
+            self.loop_order = np.argsort(keys, kind="stable")
+            self.loop_keys = keys[self.loop_order]
+        keys = np.asarray(v0, dtype=np.int64) * len(self.vertices) + np.asarray(v1, dtype=np.int64)
+        if len(self.loop_keys) == 0:
+            return np.full(np.shape(keys), -1, dtype=np.int64)
+        position = np.searchsorted(self.loop_keys, keys)
+        position = np.minimum(position, len(self.loop_keys) - 1)
+        found = self.loop_keys[position] == keys
+        return np.where(found, self.loop_order[position], -1)
+
+    def find_loop(self, v0, v1):
+        index = int(self.find_loops(v0, v1))
+        if index < 0:
+            return None
+        return self.loops[index]
+
+    def loops_open(self):
+        """Vectorised Loop.is_open: a boolean per loop."""
+        # Twins share the answer, so every wall is looked up once
+        loops = np.flatnonzero(self.loop_twin > np.arange(len(self.loop_twin)))
+        twins = self.loop_twin[loops]
+        is_open = np.zeros(len(self.loop_twin), dtype=bool)
+        face_pairs = np.stack([self.loop_face[loops], self.loop_face[twins]], axis=1)
+        is_open[loops] = is_open[twins] = self.maze.contains_connections(face_pairs)
+        return is_open
 
     def to_json(self):
-        vertices = [v.to_json() for v in self.vertices]
+        vertices = self.vertex_coordinates.tolist()
         faces = [f.to_json() for f in self.faces]
         return {"vertices": vertices, "faces": faces}
 
     def to_file(self, filename):
         with open(f"jsons/"+filename, "w") as f:
             f.write(self.to_json())
-        
+
     def bounding_box(self):
-        min_x = min_y = float('inf')
-        max_x = max_y = float('-inf')
-        for x,y in self.vertices:
-            min_x = min(min_x, x)
-            min_y = min(min_y, y)
-            max_x = max(max_x, x)
-            max_y = max(max_y, y)
+        min_x, min_y = self.vertex_coordinates.min(axis=0)
+        max_x, max_y = self.vertex_coordinates.max(axis=0)
         return min_x, min_y, max_x, max_y
 
-    def new_vertex(self, x, y):
-        return Vertex(np.array([x,y]), self)
-    
-    def new_face(self, vertices):
-        return Face(vertices, self)
-
-
     def graph_contains_edge(self, edge):
+        return self.maze.contains_connection(edge)
 
-        edge = (edge[0], edge[1])
-        edge_reversed = (edge[1], edge[0])
-        return (edge in self.graph) or (edge_reversed in self.graph)
-    
 
     def possible_edges(self):
-        pass
\ No newline at end of file
+        pass
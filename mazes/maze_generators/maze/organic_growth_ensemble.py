@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import shapely
+
+from .boundary_field import BoundaryField
+from .organic_growth_maze import OrganicGrowthMaze
+
+
+@dataclass
+class EnsembleResult:
+    seed: int
+    iterations: int  # steps taken before the run settled or hit num_iterations
+    kinetic_energy: float  # kinetic energy of the free nodes at the end of the run
+    nr_nodes: int
+    seconds: float
+    maze: OrganicGrowthMaze  # returned without its boundary field, see run_ensemble
+
+
+# Boundary shared by all runs of a worker process, set once by _init_worker
+_boundary = {}
+
+
+def _init_worker(boundary_wkb, boundary_field):
+    _boundary["polygon"] = shapely.from_wkb(boundary_wkb)
+    _boundary["field"] = boundary_field
+
+
+def _run_one(seed, nr_points, fixed_points, parameters, simulate_kwargs):
+    start = time.perf_counter()
+    maze = OrganicGrowthMaze(nr_points, fixed_points, _boundary["polygon"], seed=seed)
+    for name, value in parameters.items():
+        setattr(maze, name, value)
+    if _boundary["field"] is not None:
+        maze.use_boundary_field(field=_boundary["field"])
+
+    iterations = maze.simulate(**simulate_kwargs)
+    maze.boundary_field = None  # don't ship the raster back with every result
+    return EnsembleResult(
+        seed=seed,
+        iterations=iterations,
+        kinetic_energy=maze.kinetic_energy,
+        nr_nodes=len(maze.nodes),
+        seconds=time.perf_counter() - start,
+        maze=maze,
+    )
+
+
+def run_ensemble(seeds, nr_points, fixed_points, boundary_polygon, parameters=None,
+                 simulate_kwargs=None, boundary_resolution=None, max_workers=None):
+    """Grow one OrganicGrowthMaze per seed on a process pool.
+
+    The boundary polygon, and the rasterised BoundaryField when
+    ``boundary_resolution`` is given, are sent to every worker once instead
+    of with every run. ``parameters`` are set as attributes on each maze
+    before ``maze.simulate(**simulate_kwargs)``. Results are yielded as
+    EnsembleResult in the order the runs finish.
+    """
+    parameters = parameters or {}
+    simulate_kwargs = simulate_kwargs or {"num_iterations": 1500, "dt": 0.1}
+    field = None
+    if boundary_resolution is not None:
+        field = BoundaryField(boundary_polygon, boundary_resolution)
+
+    pool = ProcessPoolExecutor(
+        max_workers,
+        initializer=_init_worker,
+        initargs=(shapely.to_wkb(boundary_polygon), field),
+    )
+    try:
+        futures = [
+            pool.submit(_run_one, seed, nr_points, fixed_points, parameters, simulate_kwargs)
+            for seed in seeds
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
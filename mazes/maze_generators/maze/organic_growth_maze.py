@@ -1,13 +1,32 @@
-import random
+import os
+
 import numpy as np
-from scipy.spatial import distance_matrix
-from shapely import Point
-from shapely.ops import nearest_points
-from .maze import Maze
+from scipy.spatial import cKDTree
+import shapely
+from .barnes_hut import barnes_hut_repulsion
+from .binary import read_binary, write_binary
+from .boundary_field import BoundaryField
+from .maze import Maze, edge_key, edge_keys
+
+
+def reserve(buffer, size):
+    """Return ``buffer`` or, when it holds fewer than ``size`` rows, a copy with doubled capacity."""
+    if size <= len(buffer):
+        return buffer
+    grown = np.empty((max(size, 2 * len(buffer)),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
 
 
 class OrganicGrowthMaze(Maze):
-    def __init__(self, nr_points, fixed_points, boundary_polygon):
+    # Scalar settings saved in a checkpoint next to the simulation arrays
+    PARAMETERS = (
+        "k_spring", "rest_length", "k_repulsion", "min_distance", "dt", "num_iterations",
+        "k_bend", "max_velocity", "growth_start", "growth_stop", "growth_interval",
+        "contour_interval", "nr_points", "name", "k_far", "far_theta", "far_softening",
+    )
+
+    def __init__(self, nr_points, fixed_points, boundary_polygon, seed=None):
         self.k_spring = 5  # spring stiffness
         self.rest_length = 0.1  # rest length of the springs
         self.k_repulsion = 3.5  # repulsion stiffness for non-connected nodes
@@ -15,19 +34,96 @@ class OrganicGrowthMaze(Maze):
         self.dt = 0.10  # time step
         self.num_iterations = 1500  # number of iterations
         self.k_bend = 0.0
+        self.max_velocity = 1  # velocities are clipped to [-max_velocity, max_velocity]
+        self.growth_start = 30  # nodes are added every growth_interval iterations
+        self.growth_stop = 700  # between growth_start and growth_stop
+        self.growth_interval = 2
+        self.k_far = 0.0  # long range repulsion between all nodes, off when 0
+        self.far_theta = 0.5  # Barnes-Hut opening angle, 0 is exact
+        self.far_softening = 0.2  # keeps the long range force finite at short distances
 
         self.nr_points = nr_points
         self.fixed_points = fixed_points
         self.bounding_polygon = boundary_polygon
+        shapely.prepare(self.bounding_polygon)  # Speeds up the repeated containment tests
         self.bounding_polygon_buffer = self.bounding_polygon.buffer(-self.min_distance)
+        self.boundary_field = None
+        self.contour_interval = 10  # iterations between two contour corrections
 
         self.name = "Organic Growth Maze"
+        self.rng = np.random.default_rng(seed)
         self.init_nodes()
 
+    # Nodes, velocities and connections live in preallocated buffers that
+    # double when full; the properties are views on the active rows.
+    @property
+    def nodes(self):
+        return self._node_buffer[:self._nr_active_nodes]
+
+    @nodes.setter
+    def nodes(self, nodes):
+        nodes = np.asarray(nodes, dtype=float).reshape(-1, 2)
+        self._node_buffer = reserve(np.empty((0, 2)), len(nodes))
+        self._node_buffer[:len(nodes)] = nodes
+        self._nr_active_nodes = len(nodes)
+
+    @property
+    def velocities(self):
+        return self._velocity_buffer[:self._nr_active_nodes]
+
+    @velocities.setter
+    def velocities(self, velocities):
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 2)
+        self._velocity_buffer = np.empty_like(self._node_buffer)
+        self._velocity_buffer[:len(velocities)] = velocities
+
+    @property
+    def connections(self):
+        return self._edge_buffer[:self._nr_active_edges]
+
+    @connections.setter
+    def connections(self, connections):
+        connections = np.asarray(connections, dtype=np.int64).reshape(-1, 2)
+        self._edge_buffer = reserve(np.empty((0, 2), dtype=np.int64), len(connections))
+        self._edge_buffer[:len(connections)] = connections
+        self._nr_active_edges = len(connections)
+        self._edge_index = None
+
+    def append_node(self, position):
+        """Add a node at rest at ``position``, O(1) amortised; returns its index."""
+        index = self._nr_active_nodes
+        self._node_buffer = reserve(self._node_buffer, index + 1)
+        self._velocity_buffer = reserve(self._velocity_buffer, index + 1)
+        self._node_buffer[index] = position
+        self._velocity_buffer[index] = 0
+        self._nr_active_nodes += 1
+        return index
+
+    def append_connection(self, start, end):
+        index = self._nr_active_edges
+        self._edge_buffer = reserve(self._edge_buffer, index + 1)
+        self._edge_buffer[index] = start, end
+        self._nr_active_edges += 1
+        self._edge_index = None
+
+    def add_connection(self, start, end):
+        self.append_connection(start, end)
+
+    def remove_connection(self, start, end):
+        """Remove the connection between start and end, in either orientation."""
+        found = np.flatnonzero(edge_keys(self.connections) == edge_key(start, end))
+        if len(found) == 0:
+            raise ValueError(f"no connection between {start} and {end}")
+        index = found[0]
+        # shift the later edges down so the edge order is kept
+        self._edge_buffer[index:self._nr_active_edges - 1] = self._edge_buffer[index + 1:self._nr_active_edges]
+        self._nr_active_edges -= 1
+        self._edge_index = None
+
     # Initialize the spring-mass system
     def init_nodes(self):
         nodes = (
-            np.random.rand(self.nr_points, 2) * 3 - 1.5
+            self.rng.random((self.nr_points, 2)) * 3 - 1.5
         )  # Random positions in a [-2, 2] square
         velocities = np.zeros_like(nodes)  # Initially, no velocity
         fixed_nodes = {idx: pos for idx, pos in self.fixed_points.items()}
@@ -39,59 +135,223 @@ class OrganicGrowthMaze(Maze):
         self.nodes = nodes
         self.velocities = velocities
         self.fixed_nodes = fixed_nodes
-        self.connections = [(i, i + 1) for i in range(self.nr_points - 1)]
-
-    def simulate(self, num_iterations, dt):
+        self.connections = np.stack(
+            [np.arange(self.nr_points - 1), np.arange(1, self.nr_points)], axis=1
+        )  # (E, 2) array of node indices
 
-        self.nodes += self.contour_force()  # Initial correction
+    def simulate(self, num_iterations, dt, tolerance=None, energy_rtol=None, window=50,
+                 adaptive_dt=False, callback=None, checkpoint_path=None, checkpoint_every=100):
+        """Run at most num_iterations steps and return the number of steps taken.
 
-        for iteration in range(num_iterations):
-            self.update_distance_matrix()
+        Once growth is over the run stops early when no free node moved more
+        than ``tolerance`` in the last step, or when the mean kinetic energy of
+        the last ``window`` steps differs less than ``energy_rtol`` (relative)
+        from the window before. With ``adaptive_dt`` a step is shortened
+        whenever the forces would change a velocity by more than
+        ``max_velocity``. ``callback(iteration, num_iterations, maze)`` is
+        called after every step. With ``checkpoint_path`` the full state is
+        saved every ``checkpoint_every`` steps, see ``resume``.
+        """
+        nodes = self.nodes
+        nodes += self.contour_force()  # Initial correction
 
-            forces = np.zeros_like(self.nodes)
-            forces += self.connection_force()
-            forces += self.reple_force()
-            if iteration % 10 == 9:
-                forces += self.contour_force()
+        self.iteration = 0
+        self.energies = []
+        self.run_settings = {
+            "num_iterations": num_iterations,
+            "dt": dt,
+            "tolerance": tolerance,
+            "energy_rtol": energy_rtol,
+            "window": window,
+            "adaptive_dt": adaptive_dt,
+            "checkpoint_path": checkpoint_path,
+            "checkpoint_every": checkpoint_every,
+        }
+        return self.run(callback)
 
-            self.update_positions(forces, dt)
+    def run(self, callback=None):
+        """Continue the run set up by ``simulate`` from ``self.iteration``."""
+        settings = self.run_settings
+        num_iterations = settings["num_iterations"]
+        checkpoint_path = settings["checkpoint_path"]
 
+        while self.iteration < num_iterations:
+            iteration = self.iteration
+            displacement = self.step(iteration, settings["dt"], settings["adaptive_dt"])
             self.add_node(iteration)
-            print(f"Iteration {iteration}/{num_iterations}")
+            self.energies.append(self.kinetic_energy)
+            self.iteration += 1
+
+            if callback is not None:
+                callback(iteration, num_iterations, self)
+            if self.converged(displacement):
+                break
+            if checkpoint_path is not None and self.iteration % settings["checkpoint_every"] == 0:
+                self.save_checkpoint(checkpoint_path)
+        return self.iteration
+
+    def converged(self, displacement):
+        settings = self.run_settings
+        if self.iteration <= self.growth_stop:
+            return False
+        if settings["tolerance"] is not None and displacement < settings["tolerance"]:
+            return True
+        window = settings["window"]
+        if settings["energy_rtol"] is not None and len(self.energies) >= 2 * window:
+            previous = np.mean(self.energies[-2 * window:-window])
+            current = np.mean(self.energies[-window:])
+            return abs(current - previous) <= settings["energy_rtol"] * previous
+        return False
+
+    def save_checkpoint(self, path):
+        """Write the complete simulation state, including the RNG, to ``path``.
+
+        The file is written next to ``path`` first and then moved in place, so
+        an interrupted write never destroys the previous checkpoint.
+        """
+        field = self.boundary_field
+        metadata = {
+            "class": self.__class__.__name__,
+            "parameters": {name: getattr(self, name) for name in self.PARAMETERS},
+            "fixed_points": [[int(i), *map(float, pos)] for i, pos in self.fixed_points.items()],
+            "fixed_nodes": [[int(i), *map(float, pos)] for i, pos in self.fixed_nodes.items()],
+            "rng_state": self.rng.bit_generator.state,
+            "iteration": self.iteration,
+            "run_settings": self.run_settings,
+            "boundary_field": None if field is None else {
+                "resolution": field.resolution, "margin": field.margin,
+            },
+        }
+        arrays = {
+            "nodes": self.nodes,
+            "velocities": self.velocities,
+            "connections": self.connections,
+            "energies": np.asarray(self.energies, dtype=float),
+            "boundary": np.frombuffer(shapely.to_wkb(self.bounding_polygon), dtype=np.uint8),
+        }
+        tmp_path = f"{path}.tmp"
+        write_binary(tmp_path, metadata, arrays)
+        os.replace(tmp_path, path)
 
-    def update_distance_matrix(self):
-        self.distance_matrix = distance_matrix(self.nodes, self.nodes)
+    @classmethod
+    def load_checkpoint(cls, path):
+        metadata, arrays = read_binary(path, mmap_mode=None)
+        maze = cls.__new__(cls)
+        for name, value in metadata["parameters"].items():
+            setattr(maze, name, value)
+
+        maze.fixed_points = {i: (x, y) for i, x, y in metadata["fixed_points"]}
+        maze.bounding_polygon = shapely.from_wkb(arrays["boundary"].tobytes())
+        shapely.prepare(maze.bounding_polygon)
+        maze.bounding_polygon_buffer = maze.bounding_polygon.buffer(-maze.min_distance)
+        maze.boundary_field = None
+        if metadata["boundary_field"] is not None:
+            maze.boundary_field = BoundaryField(maze.bounding_polygon, **metadata["boundary_field"])
+
+        maze.rng = np.random.default_rng()
+        maze.rng.bit_generator.state = metadata["rng_state"]
+        maze.nodes = arrays["nodes"]
+        maze.velocities = arrays["velocities"]
+        maze.connections = arrays["connections"]
+        maze.fixed_nodes = {i: (x, y) for i, x, y in metadata["fixed_nodes"]}
+        maze.iteration = metadata["iteration"]
+        maze.energies = arrays["energies"].tolist()
+        maze.run_settings = metadata["run_settings"]
+        return maze
+
+    @classmethod
+    def resume(cls, path, callback=None):
+        """Load a checkpoint and finish its run, returns the maze.
+
+        The result is bit-for-bit identical to the run that was never interrupted.
+        """
+        maze = cls.load_checkpoint(path)
+        maze.run(callback)
+        return maze
+
+    def step(self, iteration, dt, adaptive_dt=False):
+        """One integration step, returns the largest displacement of a free node."""
+        self.update_neighbour_pairs()
+
+        forces = np.zeros_like(self.nodes)
+        forces += self.connection_force()
+        forces += self.reple_force()
+        if iteration % self.contour_interval == self.contour_interval - 1:
+            forces += self.contour_force()
+        if self.k_far:
+            forces += self.far_field_force()
+
+        if adaptive_dt:
+            dt = self.adaptive_dt(forces, dt)
+        return self.update_positions(forces, dt)
+
+    def adaptive_dt(self, forces, dt):
+        """Largest step up to dt for which no velocity changes by more than max_velocity."""
+        max_force = np.abs(forces).max(initial=0)
+        if max_force * dt > self.max_velocity:
+            return self.max_velocity / max_force
+        return dt
+
+    @property
+    def kinetic_energy(self):
+        """Kinetic energy of the free (not fixed) nodes."""
+        free = np.ones(len(self.nodes), dtype=bool)
+        free[list(self.fixed_nodes)] = False
+        return 0.5 * float((self.velocities[free] ** 2).sum())
+
+    def update_neighbour_pairs(self):
+        """Find all node pairs closer than min_distance, the only ones that repel."""
+        tree = cKDTree(self.nodes)
+        self.neighbour_pairs = tree.query_pairs(self.min_distance, output_type="ndarray")
 
     def add_node(self, iteration):
-        if iteration % 2 == 0 and iteration < 700 and iteration > 30:
-            connection = random.choices(self.connections)[0]
-            start = connection[0]
-            end = connection[1]
-            new_point = (self.nodes[start] + self.nodes[end]) / 2
-            self.nodes = np.vstack([self.nodes, new_point])
-            self.velocities = np.vstack([self.velocities, np.zeros(2)])
-            self.connections.remove(connection)
-            self.connections.append([len(self.nodes) - 1, start])
-            self.connections.append([len(self.nodes) - 1, end])
+        if (iteration % self.growth_interval == 0
+                and self.growth_start < iteration < self.growth_stop):
+            # Split a random connection in two at its midpoint
+            index = int(self.rng.random() * len(self.connections))
+            start, end = self.connections[index]
+            new = self.append_node((self.nodes[start] + self.nodes[end]) / 2)
+            self._edge_buffer[index] = new, start
+            self.append_connection(new, end)
+
 
+    def use_boundary_field(self, resolution=0.01, field=None):
+        """Rasterise the boundary into a signed distance field (or reuse ``field``).
+
+        Containment and push back then come from bilinear samples of the field,
+        cheap enough to apply the contour force every iteration.
+        """
+        if field is None:
+            field = BoundaryField(self.bounding_polygon, resolution)
+        self.boundary_field = field
+        self.contour_interval = 1
 
     def contour_force(self):
+        if self.boundary_field is not None:
+            return self.boundary_field_force()
+
         forces = np.zeros_like(self.nodes)
-        for i, p in enumerate(self.nodes):
-            point = Point(p)
-            if not self.bounding_polygon.contains(point):
-                    # Reflect the node back to the polygon
-                # nearest_point = bounding_polygon.exterior.interpolate(bounding_polygon.exterior.project(point))
-                nearest_point = nearest_points(self.bounding_polygon, point)[0]
-                forces[i] += (np.array(nearest_point.coords[0]) - p) * self.k_repulsion # Show the final result
+        inside = shapely.contains_xy(self.bounding_polygon, self.nodes[:, 0], self.nodes[:, 1])
+        outside = ~inside
+        if outside.any():
+            # Pull the nodes outside back to the nearest point of the polygon, for
+            # a node in a hole of the polygon that is a point on the hole's ring
+            lines = shapely.shortest_line(self.bounding_polygon, shapely.points(self.nodes[outside]))
+            nearest_point = shapely.get_coordinates(lines)[0::2]
+            forces[outside] = (nearest_point - self.nodes[outside]) * self.k_repulsion
         return forces
 
-    # Compute spring forces between connected nodes
-    def spring_force(self, node1, node2):
-        displacement = node2 - node1
-        distance = np.linalg.norm(displacement)
-        force_magnitude = self.k_spring * (distance - self.rest_length)
-        return force_magnitude * displacement / (distance)
+    def boundary_field_force(self):
+        forces = np.zeros_like(self.nodes)
+        outside = ~self.boundary_field.contains(self.nodes)
+        if outside.any():
+            nearest_point = self.boundary_field.nearest_points(self.nodes[outside])
+            forces[outside] = (nearest_point - self.nodes[outside]) * self.k_repulsion
+        return forces
+
+    def far_field_force(self):
+        """Soft repulsion between all nodes, O(N log N) with a Barnes-Hut quadtree."""
+        return self.k_far * barnes_hut_repulsion(self.nodes, self.far_theta, self.far_softening)
 
     # Compute repulsive forces to maintain a minimum distance between non-connected nodes
     def repulsive_force(self, node1, node2):
@@ -102,59 +362,53 @@ class OrganicGrowthMaze(Maze):
             return -force_magnitude * displacement / (distance + self.min_distance)
         return np.array([0.0, 0.0])
 
-    def connection_force(self):
-        forces = np.zeros_like(self.nodes)
-        # Apply spring forces
-        for i, j in self.connections:
-            f = self.spring_force(self.nodes[i], self.nodes[j])
-            forces[i] += f
-            forces[j] -= f
+    def scatter_pair_forces(self, i, j, force):
+        """Sum ``force`` on nodes ``i`` and its reaction on nodes ``j`` per node."""
+        num_nodes = len(self.nodes)
+        forces = np.empty_like(self.nodes)
+        for axis in range(2):
+            forces[:, axis] = np.bincount(i, force[:, axis], minlength=num_nodes)
+            forces[:, axis] -= np.bincount(j, force[:, axis], minlength=num_nodes)
         return forces
 
+    def connection_force(self):
+        # Apply spring forces on all connections at once
+        i, j = self.connections[:, 0], self.connections[:, 1]
+        displacement = self.nodes[j] - self.nodes[i]
+        distance = np.linalg.norm(displacement, axis=1)
+        force_magnitude = self.k_spring * (distance - self.rest_length)
+        force = (force_magnitude / distance)[:, None] * displacement
+        return self.scatter_pair_forces(i, j, force)
+
     def reple_force(self):
-        forces = np.zeros_like(self.nodes)
-        num_nodes = self.nodes.shape[0]
-        # Apply repulsive forces for non-connected nodes
-
-        force_magnitude = self.k_repulsion * (self.min_distance - self.distance_matrix)
-
-        x1, x2 = np.meshgrid(self.nodes[:, 0], self.nodes[:, 0])
-        d_x = x1 - x2
-        y1, y2 = np.meshgrid(self.nodes[:, 1], self.nodes[:, 1])
-        d_y = y1 - y2
-        displacement = np.stack([d_x, d_y], axis=2)
-        distance = np.linalg.norm(displacement, axis=2)
-
-        force_matrix = np.einsum(
-            "ij,ijk,ij->ijk",
-            1 / (distance + self.min_distance),
-            displacement,
-            -force_magnitude,
-        )
-
-        force_matrix[self.distance_matrix > self.min_distance] = 0
-        # TODO cleaner way to do this
-        for i in range(num_nodes):
-            force_matrix[i, i, :] = 0
-        for i, j in self.connections:
-            force_matrix[i, j, :] = 0
-            force_matrix[j, i, :] = 0
-
-        forces = force_matrix.sum(axis=1)
-        forces = np.nan_to_num(forces, 0)
-        return forces
+        # Apply repulsive forces for non-connected nodes within min_distance
+        pairs = self.neighbour_pairs
+        pairs = pairs[~np.isin(edge_keys(pairs), edge_keys(self.connections))]
+        i, j = pairs[:, 0], pairs[:, 1]
+
+        displacement = self.nodes[j] - self.nodes[i]
+        distance = np.linalg.norm(displacement, axis=1)
+        force_magnitude = self.k_repulsion * (self.min_distance - distance)
+        force = (-force_magnitude / (distance + self.min_distance))[:, None] * displacement
+        return self.scatter_pair_forces(i, j, force)
 
     # Update the position of the nodes with Verlet integration
     def update_positions(self, forces, dt):
         # Verlet integration: x(t+dt) = x(t) + v(t) * dt + 0.5 * a(t) * dt^2
-        self.nodes += self.velocities * dt + 0.5 * forces * dt**2
-        self.velocities += forces * dt
+        nodes = self.nodes
+        velocities = self.velocities
+        displacement = velocities * dt + 0.5 * forces * dt**2
+        nodes += displacement
+        velocities += forces * dt
 
-        self.velocities *= 0.9  # Damping to prevent infinite oscillations
-        self.velocities = np.clip(
-            self.velocities, -1, 1
+        velocities *= 0.9  # Damping to prevent infinite oscillations
+        np.clip(
+            velocities, -self.max_velocity, self.max_velocity, out=velocities
         )  # Limit the velocity to prevent instability
 
         # Apply fixed nodes
         for idx, pos in self.fixed_nodes.items():
-            self.nodes[idx] = pos
+            nodes[idx] = pos
+            displacement[idx] = 0
+
+        return float(np.linalg.norm(displacement, axis=1).max(initial=0))
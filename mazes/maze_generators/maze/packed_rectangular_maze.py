@@ -0,0 +1,156 @@
+import json
+import numpy as np
+from .binary import write_binary
+from .rectangular_maze import RectangularMaze
+
+# Wall bits of a cell; a set bit is a wall to the east / north neighbour
+EAST = 1
+NORTH = 2
+
+
+class PackedRectangularMaze(RectangularMaze):
+    """RectangularMaze stored as one uint8 of wall bits per cell.
+
+    ``walls[y, x]`` holds the EAST and NORTH bits of cell ``(x, y)``, node
+    ``y * nr_col + x``. The bits on the east and north border are always
+    set. That is one byte per cell, so 10^8 cells take 100 MB, where the
+    list based RectangularMaze needs hundreds of bytes per cell. ``nodes``
+    and ``connections`` are computed from the walls when accessed, and
+    assigning ``connections`` (or ``graph``) sets the walls from an edge list.
+    Walls memory-mapped read-only by ``Maze.from_binary`` are copied into
+    memory on the first change.
+    """
+
+    def __init__(self, nr_col, nr_row, walls=None):
+        self.nr_col = nr_col
+        self.nr_row = nr_row
+        self.name = "Indexed Maze"
+        self._edge_index = None
+        if walls is None:
+            walls = np.full((nr_row, nr_col), EAST | NORTH, dtype=np.uint8)
+        self.walls = walls
+
+    @classmethod
+    def from_maze(cls, maze):
+        packed = cls(maze.nr_col, maze.nr_row)
+        packed.name = maze.name
+        packed.connections = maze.edge_array()
+        return packed
+
+    @classmethod
+    def from_walls(cls, horizontal, vertical):
+        """From the wall planes of recursive_division_walls, True is a wall."""
+        nr_row, nr_col = vertical.shape[0], vertical.shape[1] + 1
+        maze = cls(nr_col, nr_row)
+        maze.walls[:, :-1] = np.where(vertical, EAST, 0) | NORTH
+        maze.walls[:-1] &= np.where(horizontal, NORTH, 0).astype(np.uint8) | EAST
+        return maze
+
+    @classmethod
+    def from_rows(cls, rows, nr_col, nr_row):
+        """From ``(east, north)`` rows as yielded by eller_rows, filled one row at a time."""
+        maze = cls(nr_col, nr_row)
+        for y, (east, north) in enumerate(rows):
+            maze.walls[y, :-1] = np.where(east, EAST, 0) | np.where(north[:-1], NORTH, 0)
+            maze.walls[y, -1] = EAST | (NORTH if north[-1] else 0)
+        maze.walls[-1] |= NORTH
+        return maze
+
+    def writable_walls(self):
+        """``walls``, first copied into memory when it is a read-only map."""
+        if not self.walls.flags.writeable:
+            self.walls = np.array(self.walls)
+        return self.walls
+
+    @property
+    def nodes(self):
+        """``(nr_nodes, 2)`` array of ``[x, y]``, built on every access."""
+        index = np.arange(self.nr_nodes, dtype=np.int64)
+        return np.stack([index % self.nr_col, index // self.nr_col], axis=1)
+
+    @property
+    def nr_nodes(self):
+        return self.nr_col * self.nr_row
+
+    @property
+    def connections(self):
+        return self.edge_array()
+
+    @connections.setter
+    def connections(self, edges):
+        """Set the walls from an edge list; every other wall is closed."""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        start = edges.min(axis=1)
+        step = edges.max(axis=1) - start
+
+        north = step == self.nr_col
+        east = ~north & (step == 1) & (start % self.nr_col != self.nr_col - 1)
+        if not (north | east).all():
+            raise ValueError("edges must connect neighbouring cells of the grid")
+
+        walls = self.writable_walls().reshape(-1)
+        walls[:] = EAST | NORTH
+        walls[start[east]] &= ~np.uint8(EAST)
+        walls[start[north]] &= ~np.uint8(NORTH)
+
+    def edge_array(self):
+        """The passages as an ``(E, 2)`` int64 array, east edges first, then north ones."""
+        walls = self.walls.reshape(-1)
+        index = np.arange(self.nr_nodes, dtype=np.int64)
+        east = index[(walls & EAST) == 0]
+        north = index[(walls & NORTH) == 0]
+        return np.concatenate([
+            np.stack([east, east + 1], axis=1),
+            np.stack([north, north + self.nr_col], axis=1),
+        ])
+
+    def _wall_bits(self, edges):
+        """Cell and wall bit of every edge, bit 0 when the cells are not neighbours."""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        start = np.minimum(edges[:, 0], edges[:, 1])
+        step = np.maximum(edges[:, 0], edges[:, 1]) - start
+        bit = np.where(step == self.nr_col, NORTH, 0)
+        bit = np.where((bit == 0) & (step == 1) & (start % self.nr_col != self.nr_col - 1), EAST, bit)
+        return start, bit.astype(np.uint8)
+
+    def contains_connection(self, edge):
+        start, end = sorted((int(edge[0]), int(edge[1])))
+        if end - start == self.nr_col:
+            bit = NORTH
+        elif end - start == 1 and start % self.nr_col != self.nr_col - 1:
+            bit = EAST
+        else:
+            return False
+        return not self.walls.flat[start] & bit
+
+    def contains_connections(self, edges):
+        start, bit = self._wall_bits(edges)
+        valid = (bit != 0) & (start >= 0) & (start < self.nr_nodes)
+        walls = self.walls.reshape(-1)[np.where(valid, start, 0)]
+        return valid & ((walls & bit) == 0)
+
+    def add_connection(self, start, end):
+        cell, bit = self._wall_bits([start, end])
+        if bit[0] == 0:
+            raise ValueError(f"{start} and {end} are not neighbours")
+        self.writable_walls().flat[cell[0]] &= ~bit[0]
+
+    def remove_connection(self, start, end):
+        if not self.contains_connection((start, end)):
+            raise ValueError(f"no connection between {start} and {end}")
+        cell, bit = self._wall_bits([start, end])
+        self.writable_walls().flat[cell[0]] |= bit[0]
+
+    def to_json(self):
+        d = {
+            "class": self.__class__.__name__,
+            "name": self.name,
+            "graph": self.edge_array().tolist(),
+            "nr_col": self.nr_col,
+            "nr_row": self.nr_row,
+        }
+        return json.dumps(d, indent=2)
+
+    def to_binary(self, path):
+        """Write only the wall bits, ``from_binary`` maps them back without conversion."""
+        write_binary(path, self.binary_metadata(), {"walls": self.walls})
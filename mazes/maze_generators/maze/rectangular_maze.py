@@ -4,6 +4,7 @@
 import json
 import numpy as np
 from .maze_mesh import MazeMesh
+from .binary import write_binary
 from .maze import Maze
 
 
@@ -12,14 +13,24 @@ class RectangularMaze(Maze):
         self.nr_col = nr_col
         self.nr_row = nr_row
 
-        nodes = []
-        for y in range(nr_row):
-            for x in range(nr_col):
-                nodes.append([x,y])
-
         graph = []
-        super().__init__(nodes, graph)
+        super().__init__(None, graph)  # nodes follow from the grid, built on first access
+
+    @property
+    def nodes(self):
+        """``[x, y]`` of every cell as a list, node ``y * nr_col + x``."""
+        if self._nodes is None:
+            index = np.arange(self.nr_col * self.nr_row)
+            self._nodes = np.stack([index % self.nr_col, index // self.nr_col], axis=1).tolist()
+        return self._nodes
 
+    @nodes.setter
+    def nodes(self, nodes):
+        self._nodes = nodes
+
+    @property
+    def nr_nodes(self):
+        return self.nr_col * self.nr_row
 
     @property
     def shape(self):
@@ -34,17 +45,27 @@ class RectangularMaze(Maze):
             self.graph.append((i, i+self.nr_col))
 
     def to_maze_mesh(self):
-        verts = []
-        for y in range(self.nr_row + 1):
-            for x in range(self.nr_col + 1):
-                verts.append((x - 0.5,y - 0.5))
-
-        faces = []
-        for y in range(self.nr_row):
-            for x in range(self.nr_col):
-                faces.append( [y*(self.nr_col+1)+x, y*(self.nr_col+1)+x+1, (y+1)*(self.nr_col+1)+x+1, (y+1)*(self.nr_col+1)+x])
-        
-        return MazeMesh(self, verts, faces)
+        """Quad mesh of the grid, vertices and faces built with broadcasting.
+
+        Vertex ``(x, y)`` of the ``(nr_col + 1) x (nr_row + 1)`` corner grid is
+        ``y * (nr_col + 1) + x``; face ``f`` is cell ``f`` with its corners
+        counter-clockwise from the lower left one.
+        """
+        x, y = np.meshgrid(np.arange(self.nr_col + 1) - 0.5, np.arange(self.nr_row + 1) - 0.5)
+        vertices = np.stack([x.ravel(), y.ravel()], axis=1)
+
+        corner = (np.arange(self.nr_row)[:, None] * (self.nr_col + 1) + np.arange(self.nr_col)).ravel()
+        faces = np.stack([corner, corner + 1, corner + self.nr_col + 2, corner + self.nr_col + 1], axis=1)
+
+        # Loops of face f are 4f + (south, east, north, west); the twin of a
+        # side is the opposite side of the neighbouring cell, -1 on the border
+        face = 4 * np.arange(self.nr_nodes, dtype=np.int64).reshape(self.nr_row, self.nr_col)
+        loop_twin = np.full((self.nr_row, self.nr_col, 4), -1, dtype=np.int64)
+        loop_twin[1:, :, 0] = face[:-1] + 2
+        loop_twin[:, :-1, 1] = face[:, 1:] + 3
+        loop_twin[:-1, :, 2] = face[1:]
+        loop_twin[:, 1:, 3] = face[:, :-1] + 1
+        return MazeMesh(self, vertices, faces, loop_twin.ravel())
 
     
     def __getitem__(self, pos):
@@ -62,7 +83,7 @@ class RectangularMaze(Maze):
                     s+= str(self[x,y])
                 else:
                     s += '+'
-                if self.graph_contains_edge((self[x,y], self[x+1,y])):
+                if self.contains_connection((self[x,y], self[x+1,y])):
                     s += '--'
                 else:
                     s += '  '
@@ -71,7 +92,7 @@ class RectangularMaze(Maze):
                 break
             s += f'{y-1:2d} '
             for x in range(w):
-                if self.graph_contains_edge((self[x,y], self[x+1,y])):
+                if self.contains_connection((self[x,y], self[x+1,y])):
                     s += '|'
                 else:
                     s += ' '
@@ -85,20 +106,52 @@ class RectangularMaze(Maze):
 
         return s
     
-    def possible_edges(self):
-        possiblle_edges = np.zeros((self.nr_col*self.nr_row, self.nr_col*self.nr_row), dtype=bool)
+    def contains_connections(self, edges):
+        """Vectorised contains_connection, looked up in open east/north flags per cell."""
+        nr_nodes = self.nr_nodes
+        connections = self.edge_array()
+        start = np.minimum(connections[:, 0], connections[:, 1])
+        is_north = np.maximum(connections[:, 0], connections[:, 1]) - start == self.nr_col
+        open_east = np.zeros(nr_nodes, dtype=bool)
+        open_north = np.zeros(nr_nodes, dtype=bool)
+        open_east[start[~is_north]] = True
+        open_north[start[is_north]] = True
+
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        start = np.minimum(edges[:, 0], edges[:, 1])
+        step = np.maximum(edges[:, 0], edges[:, 1]) - start
+        cell = np.clip(start, 0, max(nr_nodes - 1, 0))
+        north = (step == self.nr_col) & open_north[cell]
+        east = (step == 1) & (start % self.nr_col != self.nr_col - 1) & open_east[cell]
+        return (start >= 0) & (start < nr_nodes) & (north | east)
+
+    def adjacency(self):
+        """Sparse CSR adjacency of the grid as ``(indptr, indices)``.
+
+        The neighbours of node ``i`` are ``indices[indptr[i]:indptr[i+1]]``.
+        Built without Python loops, memory is O(nr_nodes).
+        """
         width = self.nr_col
         height = self.nr_row
-        for x in range(0, width):
-            for y in range(0, height):
-                
-                if x < width - 1:
-                    possiblle_edges[self[x,y], self[x+1,y]] = 1
-                if y < height - 1:
-                    possiblle_edges[self[x,y], self[x,y+1]] = 1
-                    
-
-        possiblle_edges = possiblle_edges + possiblle_edges.T
+        index = np.arange(width * height, dtype=np.int64)
+        x = index % width
+        y = index // width
+
+        # candidate neighbours in the order west, east, south, north
+        candidates = np.stack([index - 1, index + 1, index - width, index + width], axis=1)
+        valid = np.stack([x > 0, x < width - 1, y > 0, y < height - 1], axis=1)
+
+        indptr = np.zeros(width * height + 1, dtype=np.int64)
+        np.cumsum(valid.sum(axis=1), out=indptr[1:])
+        indices = candidates[valid]
+        return indptr, indices
+
+    def possible_edges(self):
+        """Dense boolean adjacency matrix, only usable for small mazes."""
+        indptr, indices = self.adjacency()
+        possiblle_edges = np.zeros((self.nr_nodes, self.nr_nodes), dtype=bool)
+        rows = np.repeat(np.arange(self.nr_nodes), np.diff(indptr))
+        possiblle_edges[rows, indices] = 1
         return possiblle_edges
 
     def to_json(self):
@@ -106,8 +159,17 @@ class RectangularMaze(Maze):
             "class": self.__class__.__name__,
             "name": self.name,
             "nodes": self.nodes,
-            "graph": self.graph,
+            "graph": self.edge_array().tolist(),
             "nr_col": self.nr_col,
             "nr_row": self.nr_row,
         }
-        return json.dumps(d, indent=2)
\ No newline at end of file
+        return json.dumps(d, indent=2)
+
+    def binary_metadata(self):
+        metadata = super().binary_metadata()
+        metadata.update(nr_col=self.nr_col, nr_row=self.nr_row)
+        return metadata
+
+    def to_binary(self, path):
+        """Write the edges and grid size; the nodes follow from the grid and are not stored."""
+        write_binary(path, self.binary_metadata(), {"connections": self.edge_array()})
\ No newline at end of file
@@ -1,4 +1,4 @@
-import numpy as np
+from .utils import Viewport
 
 
 def debug_render_maze(maze: 'Maze', width: int = 500, height: int = 500) -> str:
@@ -21,17 +21,8 @@ def debug_render_maze(maze: 'Maze', width: int = 500, height: int = 500) -> str:
     ''')
 
     # Scale vertices and centroids to fit the SVG canvas
-    def scale_point(point: np.ndarray, width: int, height: int, padding: int = 50):
-        """Scale a point (np.array) to fit within the SVG canvas."""
-        max_x = np.max([v[0] for v in maze.nodes], axis=0)
-        max_y = np.max([v[1] for v in maze.nodes], axis=0)
-        min_x = np.min([v[0] for v in maze.nodes], axis=0)
-        min_y = np.min([v[1] for v in maze.nodes], axis=0)
-        scale_x = (width - 2 * padding) / (max_x - min_x)
-        scale_y = (height - 2 * padding) / (max_y - min_y)
-        scaled_x = (point[0] - min_x) * scale_x + padding
-        scaled_y = (point[1] - min_y) * scale_y + padding
-        return scaled_x, scaled_y
+    viewport = Viewport(maze.nodes, width, height)
+    nodes = viewport.transform(maze.nodes).tolist()
 
     # # Step 1: Render all vertices
     # for i, vertex in enumerate(maze.vertices):
@@ -58,17 +49,14 @@ def debug_render_maze(maze: 'Maze', width: int = 500, height: int = 500) -> str:
     #     svg.append(f'<polygon class="face" points="{points_str}"/>')
 
     # Step 4: Render all centroids
-    for i, node in enumerate(maze.nodes):
-        x, y = scale_point(node, width, height)
+    for i, (x, y) in enumerate(nodes):
         svg.append(f'<rect class="centroid" x="{x - 5}" y="{y - 5}" width="10" height="10"/>')
         svg.append(f'<text class="label" x="{x + 8}" y="{y + 5}">C{i}</text>')  # Label the centroid
 
     # Step 5: Render the graph edges (centroid connections)
-    for start_idx, end_idx in maze.connections:
-        start_centroid = maze.nodes[start_idx]
-        end_centroid = maze.nodes[end_idx]
-        x1, y1 = scale_point(start_centroid, width, height)
-        x2, y2 = scale_point(end_centroid, width, height)
+    for start_idx, end_idx in maze.edge_array().tolist():
+        x1, y1 = nodes[start_idx]
+        x2, y2 = nodes[end_idx]
         svg.append(f'<line class="graph-edge" x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"/>')
 
     # Optional Step 6: Render loop directions (if needed)
@@ -1,4 +1,3 @@
-import numpy as np
 import shapely
 from shapely.geometry import Polygon, LineString
 from shapely.ops import linemerge, unary_union, polygonize
@@ -7,20 +6,11 @@ from shapely.ops import linemerge, unary_union, polygonize
 
 import geopandas as gpd
 import matplotlib.pyplot as plt
+
+from .utils import Viewport
             
             
 
-# Scale vertices and centroids to fit the SVG canvas
-def scale_point(maze, point: np.ndarray, width: int, height: int, padding: int = 50):
-    """Scale a point (np.array) to fit within the SVG canvas."""
-    max_x, max_y = np.max([v.coordinates for v in maze.vertices], axis=0)
-    min_x, min_y = np.min([v.coordinates for v in maze.vertices], axis=0)
-    scale_x = (width - 2 * padding) / (max_x - min_x)
-    scale_y = (height - 2 * padding) / (max_y - min_y)
-    scaled_x = (point[0] - min_x) * scale_x + padding
-    scaled_y = (point[1] - min_y) * scale_y + padding
-    return scaled_x, scaled_y
-
 def path(maze: 'Maze', width: int = 500, height: int = 500) -> str:
     """Generate an SVG representation of the maze for debugging purposes."""
     # SVG header
@@ -41,9 +31,13 @@ def path(maze: 'Maze', width: int = 500, height: int = 500) -> str:
     ''')
 
     patches = []
+
+    # Scale vertices to fit the SVG canvas
+    viewport = Viewport(maze.vertex_coordinates, width, height)
+    vertices = [tuple(v) for v in viewport.transform(maze.vertex_coordinates).tolist()]
     
     for f in maze.faces:
-        vertex_coords = [scale_point(maze,l.coor,width,height) for l in f.loops]
+        vertex_coords = [vertices[v] for v in f.vertex_indices]
 
         polygon = Polygon(vertex_coords)
         parts = []
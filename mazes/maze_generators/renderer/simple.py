@@ -1,16 +1,7 @@
 
 import numpy as np
 
-# Scale vertices and centroids to fit the SVG canvas
-def scale_point(maze, point: np.ndarray, width: int, height: int, padding: int = 50):
-    """Scale a point (np.array) to fit within the SVG canvas."""
-    max_x, max_y = np.max([v.coordinates for v in maze.vertices], axis=0)
-    min_x, min_y = np.min([v.coordinates for v in maze.vertices], axis=0)
-    scale_x = (width - 2 * padding) / (max_x - min_x)
-    scale_y = (height - 2 * padding) / (max_y - min_y)
-    scaled_x = (point[0] - min_x) * scale_x + padding
-    scaled_y = (point[1] - min_y) * scale_y + padding
-    return scaled_x, scaled_y
+from .utils import Viewport, chain_segments, drop_collinear
 
 def simple_path(maze: 'Maze', width: int = 500, height: int = 500) -> str:
     """Generate an SVG representation of the maze for debugging purposes."""
@@ -32,10 +23,12 @@ def simple_path(maze: 'Maze', width: int = 500, height: int = 500) -> str:
         </style>
     ''')
 
+    # Scale vertices and centroids to fit the SVG canvas
+    viewport = Viewport(maze.vertex_coordinates, width, height)
+    vertices = viewport.transform(maze.vertex_coordinates).tolist()
 
     # Step 1: Render all vertices
-    for i, vertex in enumerate(maze.vertices):
-        x, y = scale_point(maze, vertex.coordinates, width, height)
+    for i, (x, y) in enumerate(vertices):
         svg.append(f'<circle class="vertex" cx="{x}" cy="{y}" r="5"/>')
         svg.append(f'<text class="label" x="{x + 8}" y="{y + 5}">V{i}</text>')  # Label the vertex
 
@@ -51,24 +44,21 @@ def simple_path(maze: 'Maze', width: int = 500, height: int = 500) -> str:
     for face in maze.faces:
         points = []
         for v_index in face.vertex_indices:
-            v = maze.vertices[v_index]
-            x, y = scale_point(maze, v.coordinates, width, height)
+            x, y = vertices[v_index]
             points.append(f'{x},{y}')
         points_str = " ".join(points)
         svg.append(f'<polygon class="face" points="{points_str}"/>')
 
     # Step 4: Render all centroids
-    for i, centroid in enumerate(maze.centroids):
-        x, y = scale_point(maze, centroid, width, height)
+    centroids = viewport.transform(maze.centroids).tolist()
+    for i, (x, y) in enumerate(centroids):
         svg.append(f'<rect class="centroid" x="{x - 5}" y="{y - 5}" width="10" height="10"/>')
         svg.append(f'<text class="label" x="{x + 8}" y="{y + 5}">C{i}</text>')  # Label the centroid
 
     # Step 5: Render the graph edges (centroid connections)
     for start_idx, end_idx in maze.graph:
-        start_centroid = maze.centroids[start_idx]
-        end_centroid = maze.centroids[end_idx]
-        x1, y1 = scale_point(maze, start_centroid, width, height)
-        x2, y2 = scale_point(maze, end_centroid, width, height)
+        x1, y1 = centroids[start_idx]
+        x2, y2 = centroids[end_idx]
         svg.append(f'<line class="graph-edge" x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"/>')
 
     # Optional Step 6: Render loop directions (if needed)
@@ -112,16 +102,17 @@ def simple_outline(maze: 'Mazemesh', width: int = 500, height: int = 500, loops_
         </style>
     ''')
 
+    viewport = Viewport(maze.vertex_coordinates, width, height)
+    vertices = viewport.transform(maze.vertex_coordinates).tolist()
+
     for face in maze.faces:
         for loop in face.loops:
             if loop in loops_skip:
                 continue
             if  loop.is_open():
                 continue
-            v1 = loop.coor
-            v2 = loop.next_loop.coor
-            x1, y1 = scale_point(maze, v1.coordinates, width, height)
-            x2, y2 = scale_point(maze, v2.coordinates, width, height)
+            x1, y1 = vertices[loop.vertex_index]
+            x2, y2 = vertices[loop.vertex_next_index]
 
             svg.append(f'<line class="edge" x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"/>')
 
@@ -129,3 +120,95 @@ def simple_outline(maze: 'Mazemesh', width: int = 500, height: int = 500, loops_
     svg.append('</svg>')
     
     return "\n".join(svg)
+
+
+
+def simple_outline_paths(maze: 'Mazemesh', file, width: int = 500, height: int = 500,
+                         loops_skip=None, precision: int = 3) -> None:
+    """Stream the outline of simple_outline to ``file`` as merged ``<path>`` elements.
+
+    Every wall is drawn once, adjacent walls are chained into one polyline
+    and points on a straight run are dropped, so the plotter lifts its pen
+    far less often than with one ``<line>`` per wall.
+    """
+    if loops_skip is None:
+        loops_skip = []
+
+    if loops_skip == True:
+        loops_skip = [
+            maze.faces[0].loops[0],
+            maze.faces[-1].loops[-2]
+        ]
+
+    # A wall is a closed loop; of two twin loops only the first one is kept
+    is_wall = ~maze.loops_open()
+    is_wall &= (maze.loop_twin < 0) | (np.arange(len(maze.loops)) < maze.loop_twin)
+    is_wall[[loop.index for loop in loops_skip]] = False
+    walls = np.stack([maze.loop_vertex[is_wall], maze.loop_vertex_next[is_wall]], axis=1)
+
+    viewport = Viewport(maze.vertex_coordinates, width, height)
+    vertices = viewport.transform(maze.vertex_coordinates)
+
+    file.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+               f'width="{width}" height="{height}">\n')
+    file.write('<style> .edge { fill: none; stroke: black; stroke-width: 2; } </style>\n')
+
+    for polyline in chain_segments(walls, len(vertices)):
+        points = drop_collinear(vertices[polyline])
+        coordinates = " L".join(f"{x:.{precision}f},{y:.{precision}f}" for x, y in points.tolist())
+        file.write(f'<path class="edge" d="M{coordinates}"/>\n')
+
+    file.write('</svg>\n')
+
+
+def simple_outline_rows(rows, file, nr_col: int, nr_row: int, width: int = 500, padding: int = 50,
+                        openings: bool = True, precision: int = 3) -> None:
+    """Stream a rectangular maze given as rows of walls to ``file``, see ``eller_rows``.
+
+    ``rows`` yields ``(east, north)`` wall arrays one row at a time and is
+    consumed lazily, only the open vertical runs of the current row are
+    kept, so memory does not grow with ``nr_row``. Straight runs of walls
+    are merged into one ``<path>``. With ``openings`` the south wall of the
+    first cell and the north wall of the last cell are left out, like
+    ``loops_skip=True`` in simple_outline.
+    """
+    cell = (width - 2 * padding) / nr_col
+    height = nr_row * cell + 2 * padding
+
+    def segment(x1, y1, x2, y2):
+        file.write(f'<path class="edge" d="M{padding + x1 * cell:.{precision}f},{padding + y1 * cell:.{precision}f} '
+                   f'L{padding + x2 * cell:.{precision}f},{padding + y2 * cell:.{precision}f}"/>\n')
+
+    def horizontal_runs(walls, y):
+        edges = np.diff(np.r_[0, walls.astype(np.int8), 0])
+        for start, stop in zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()):
+            segment(start, y, stop, y)
+
+    file.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+               f'width="{width}" height="{height}">\n')
+    file.write('<style> .edge { fill: none; stroke: black; stroke-width: 2; } </style>\n')
+
+    south = np.ones(nr_col, dtype=bool)
+    south[0] = not openings
+    horizontal_runs(south, 0)
+
+    # Start row of the vertical wall running along every column line, -1 when there is none
+    run_start = np.full(nr_col + 1, -1)
+    y = 0
+    for y, (east, north) in enumerate(rows):
+        walls = np.r_[True, east, True]
+        for x in np.flatnonzero(~walls & (run_start >= 0)).tolist():
+            segment(x, run_start[x], x, y)
+        run_start[~walls] = -1
+        run_start[walls & (run_start < 0)] = y
+
+        if y == nr_row - 1 and openings:
+            north = north.copy()
+            north[-1] = False
+        horizontal_runs(north, y + 1)
+        y += 1
+
+    for x in np.flatnonzero(run_start >= 0).tolist():
+        segment(x, run_start[x], x, y)
+
+    file.write('</svg>\n')
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+class Viewport:
+    """Affine map that fits a set of points into an SVG canvas.
+
+    The fit is computed once from the bounding box of ``points``; ``transform``
+    then maps a whole ``(N, 2)`` coordinate array in a single NumPy call.
+    """
+
+    def __init__(self, points, width: int, height: int, padding: int = 50):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.min = points.min(axis=0)
+        span = points.max(axis=0) - self.min
+        span[span == 0] = 1  # a single point or a flat row of points
+        self.scale = (np.array([width, height], dtype=float) - 2 * padding) / span
+        self.padding = padding
+
+    def transform(self, points) -> np.ndarray:
+        """Scale points (an ``(N, 2)`` array or a single point) to the canvas."""
+        return (np.asarray(points, dtype=float) - self.min) * self.scale + self.padding
+
+
+def chain_segments(segments, nr_vertices: int):
+    """Chain undirected segments into polylines that share their end points.
+
+    ``segments`` is an ``(S, 2)`` array of vertex indices. Every segment ends
+    up in exactly one polyline, returned as a list of vertex indices. Walks
+    start at odd-degree vertices first so open chains are not cut in two;
+    what is left are closed loops.
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+    nr_segments = len(segments)
+    ends = np.concatenate([segments[:, 0], segments[:, 1]])
+    others = np.concatenate([segments[:, 1], segments[:, 0]])
+    segment_ids = np.concatenate([np.arange(nr_segments), np.arange(nr_segments)])
+
+    order = np.argsort(ends, kind="stable")
+    degree = np.bincount(ends, minlength=nr_vertices)
+    indptr = np.zeros(nr_vertices + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    others = others[order].tolist()
+    segment_ids = segment_ids[order].tolist()
+    cursor = indptr[:-1].tolist()  # first slot of every vertex that may be unused
+    stop = indptr[1:].tolist()
+    used = bytearray(nr_segments)
+
+    starts = np.concatenate([np.flatnonzero(degree % 2 == 1), np.flatnonzero(degree > 0)])
+    polylines = []
+    for start in starts.tolist():
+        while cursor[start] < stop[start]:
+            polyline = [start]
+            vertex = start
+            while True:
+                slot = cursor[vertex]
+                while slot < stop[vertex] and used[segment_ids[slot]]:
+                    slot += 1
+                cursor[vertex] = slot
+                if slot == stop[vertex]:
+                    break
+                used[segment_ids[slot]] = 1
+                vertex = others[slot]
+                polyline.append(vertex)
+            if len(polyline) > 1:
+                polylines.append(polyline)
+    return polylines
+
+
+def drop_collinear(points, tolerance: float = 1e-9):
+    """Remove the interior points of an ``(N, 2)`` polyline that lie on a straight run."""
+    points = np.asarray(points, dtype=float)
+    if len(points) < 3:
+        return points
+    before = points[1:-1] - points[:-2]
+    after = points[2:] - points[1:-1]
+    cross = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]
+    forward = (before * after).sum(axis=1) > 0
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:-1] = (np.abs(cross) > tolerance) | ~forward
+    return points[keep]
@@ -1,29 +1,85 @@
-import json
+import argparse
 import os
 import sys
 import inspect
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 
 currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parentdir = os.path.dirname(currentdir)
-sys.path.insert(0, parentdir) 
+sys.path.insert(0, parentdir)
 
-from maze_generators.algorthms import depth_first
+from maze_generators.algorthms import depth_first, eller, kruskal, recursive_devision, wilson
 from maze_generators.renderer.simple import simple_outline
-from maze_generators.maze.maze import Maze
 
-index = 0
-for i in range(5,21):
-    for _ in range(4):
-        index += 1
-        maze = depth_first.generate(i, i)
+ALGORITHMS = {
+    "depth_first": depth_first,
+    "recursive_devision": recursive_devision,
+    "kruskal": kruskal,
+    "wilson": wilson,
+    "eller": eller,
+}
 
-        name ="grid_{index:02}.json"
 
-        maze.to_file(name)
-        with open("jsons/" + name) as f:
-            maze = Maze.from_json(json.loads(f.read()))
+def jobs(min_size, max_size, per_size):
+    """``(index, size)`` of every maze, numbered from 1 like the original double loop."""
+    index = 0
+    for size in range(min_size, max_size + 1):
+        for _ in range(per_size):
+            index += 1
+            yield index, size
 
-        renderer = simple_outline(maze, width=500, height=500, loops_skip=True)
-        with open(f"output/grid/{index:02}_simple.svg", "w") as svg_file:
-            svg_file.write(renderer)
\ No newline at end of file
+
+def render_one(index, size, seed, algorithm, output_dir, keep_maze):
+    # seeding with (seed, index) gives every job its own stream, whatever worker runs it
+    maze = ALGORITHMS[algorithm].generate(size, size, seed=[seed, index])
+
+    renderer = simple_outline(maze.to_maze_mesh(), width=500, height=500, loops_skip=True)
+    with open(f"{output_dir}/{index:02}_simple.svg", "w") as svg_file:
+        svg_file.write(renderer)
+    return index, maze if keep_maze else None
+
+
+def save(index, maze, output_dir, save_format):
+    if save_format == "json":
+        maze.to_file(f"grid_{index:02}.json")
+    else:
+        maze.to_binary(f"{output_dir}/{index:02}.mazebin")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and render a batch of square mazes.")
+    parser.add_argument("--algorithm", choices=list(ALGORITHMS), default="depth_first")
+    parser.add_argument("--min-size", type=int, default=5)
+    parser.add_argument("--max-size", type=int, default=20)
+    parser.add_argument("--per-size", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0, help="base seed, job i uses (seed, i)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-dir", default="output/grid")
+    parser.add_argument("--save", choices=["json", "binary"], default=None,
+                        help="also store every maze, in a background thread")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.save == "json":
+        os.makedirs("jsons", exist_ok=True)
+
+    # Rendering runs on the process pool; storing mazes is I/O and runs on a
+    # thread so the next results are collected while files are written.
+    with ProcessPoolExecutor(args.workers) as pool, ThreadPoolExecutor(1) as writer:
+        futures = [
+            pool.submit(render_one, index, size, args.seed, args.algorithm, args.output_dir, args.save is not None)
+            for index, size in jobs(args.min_size, args.max_size, args.per_size)
+        ]
+        saved = []
+        for future in as_completed(futures):
+            index, maze = future.result()
+            print(f"rendered {index:02}")
+            if maze is not None:
+                saved.append(writer.submit(save, index, maze, args.output_dir, args.save))
+        for future in saved:
+            future.result()  # surface write errors
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,7 @@ def create_torus(inner_radius, outer_radius, resolution=100):
     theta = np.linspace(0, 2 * np.pi, resolution)
     outer_circle = [(outer_radius * np.cos(t), outer_radius * np.sin(t)) for t in theta]
     inner_circle = [(inner_radius * np.cos(t), inner_radius * np.sin(t)) for t in theta]
-    return Polygon(outer_circle + inner_circle[::-1])
+    return Polygon(outer_circle, [inner_circle[::-1]])
 
 
 torus_polygon = create_torus(inner_radius=0.4, outer_radius=1.5)
@@ -36,7 +36,14 @@ maze = OGMaze(
 maze.min_distance = 0.20
 maze.k_repulsion = 10
 
-maze.simulate(num_iterations=2000, dt=0.12)
+
+def report(iteration, num_iterations, maze):
+    if iteration % 100 == 0:
+        print(f"Iteration {iteration}/{num_iterations}, kinetic energy {maze.kinetic_energy:.5f}")
+
+
+iterations = maze.simulate(num_iterations=2000, dt=0.12, energy_rtol=0.02, adaptive_dt=True, callback=report)
+print(f"Settled after {iterations} iterations")
 
 maze.to_file("rdm.json")
 